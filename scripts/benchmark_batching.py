@@ -0,0 +1,78 @@
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# The server modules live in src/app and are imported flat, like in the container
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src", "app"))
+
+from batching import MicroBatcher  # noqa: E402
+from engines import OnnxEngine  # noqa: E402
+from preprocessing import prepare_image  # noqa: E402
+
+MODEL_PATH = os.path.join(BASE_DIR, "src", "app", "models", "production", "inventory_monitor_quantized.onnx")
+IMAGE_FOLDER = os.path.join(BASE_DIR, "simulation", "sample_images")
+INPUT_SIZE = 320
+BATCH_SIZES = [1, 2, 4, 8]
+CONCURRENT_CLIENTS = 8
+REQUESTS_PER_CLIENT = 25
+MAX_WAIT_MS = 5.0
+
+
+def load_inputs():
+    images = []
+    for name in sorted(os.listdir(IMAGE_FOLDER)):
+        with open(os.path.join(IMAGE_FOLDER, name), "rb") as f:
+            images.append(prepare_image(f.read(), INPUT_SIZE).pixels)
+    return images
+
+
+async def run_case(engine, tensors, max_batch_size):
+    batcher = MicroBatcher(engine, INPUT_SIZE, max_batch_size, MAX_WAIT_MS)
+    batcher.start()
+    latencies = []
+
+    async def client(offset):
+        for i in range(REQUESTS_PER_CLIENT):
+            t_start = time.perf_counter()
+            await batcher.infer(tensors[(offset + i) % len(tensors)])
+            latencies.append((time.perf_counter() - t_start) * 1000)
+
+    # Warmup so session allocations don't land in the measured window
+    await asyncio.gather(*(batcher.infer(t) for t in tensors[:max_batch_size]))
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(CONCURRENT_CLIENTS)))
+    elapsed = time.perf_counter() - t_start
+    await batcher.stop()
+
+    return batcher.max_batch_size, len(latencies) / elapsed, latencies
+
+
+async def run_benchmark():
+    if not os.path.exists(MODEL_PATH):
+        print(f"Error: model not found at '{MODEL_PATH}'.")
+        return
+
+    engine = OnnxEngine(MODEL_PATH, "int8")
+    engine.load()
+
+    tensors = load_inputs()
+    print(f"Batching benchmark: {CONCURRENT_CLIENTS} clients x {REQUESTS_PER_CLIENT} requests, "
+          f"max wait {MAX_WAIT_MS} ms")
+    print("-" * 60)
+    print(f"{'Max batch':>10} | {'Effective':>9} | {'Throughput':>14} | {'P50':>10} | {'P95':>10}")
+
+    for batch_size in BATCH_SIZES:
+        effective, throughput, latencies = await run_case(engine, tensors, batch_size)
+        p50 = statistics.median(latencies)
+        p95 = statistics.quantiles(latencies, n=20)[18]
+        print(f"{batch_size:>10} | {effective:>9} | {throughput:>10.2f} r/s | {p50:>7.2f} ms | {p95:>7.2f} ms")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+# The server modules live in src/app and are imported flat, like in the container
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src", "app"))
+os.environ.setdefault("HISTORY_DB_PATH", "")  # Don't write a history DB into the source tree
+
+import main  # noqa: E402
+
+IDLE_DASHBOARDS = 20
+DURATION_SECONDS = 10
+POLL_INTERVAL = 0.5  # Same as the old setInterval(refreshDashboard, 500)
+
+
+class RequestCounter:
+    """ASGI wrapper counting the HTTP requests that reach the app."""
+
+    def __init__(self, app):
+        self.app = app
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.requests += 1
+        await self.app(scope, receive, send)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def polling_dashboard(client, base_url, stop_at):
+    while time.perf_counter() < stop_at:
+        await client.get(f"{base_url}/status")
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def streaming_dashboard(client, base_url, stop_at):
+    try:
+        async with client.stream("GET", f"{base_url}/status/stream") as response:
+            async for _ in response.aiter_lines():
+                if time.perf_counter() >= stop_at:
+                    break
+    except httpx.ReadTimeout:
+        pass
+
+
+async def run_mode(dashboard, base_url):
+    stop_at = time.perf_counter() + DURATION_SECONDS
+    timeout = httpx.Timeout(5.0, read=DURATION_SECONDS + 1)
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        tasks = [dashboard(client, base_url, stop_at) for _ in range(IDLE_DASHBOARDS)]
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=DURATION_SECONDS + 5)
+
+
+def run_benchmark():
+    counter = RequestCounter(main.app)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(counter, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.1)
+    base_url = f"http://127.0.0.1:{port}"
+
+    print(f"Idle dashboard load: {IDLE_DASHBOARDS} dashboards for {DURATION_SECONDS}s, no inventory changes")
+    print("-" * 60)
+
+    results = {}
+    for label, dashboard in (("polling", polling_dashboard), ("streaming", streaming_dashboard)):
+        before = counter.requests
+        asyncio.run(run_mode(dashboard, base_url))
+        results[label] = counter.requests - before
+        print(f"{label:<10} | {results[label]:>6} requests | {results[label] / DURATION_SECONDS:>7.1f} req/s")
+
+    server.should_exit = True
+    thread.join(timeout=5)
+
+    print("=" * 60)
+    print(f"Request reduction: {results['polling'] / max(results['streaming'], 1):.0f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,94 @@
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src", "app"))
+
+from postprocessing import CONFIDENCE_THRESHOLD, NMS_THRESHOLD, get_processed_detections  # noqa: E402
+
+MODEL_PATH = os.path.join(BASE_DIR, "src", "app", "models", "production", "inventory_monitor_quantized.onnx")
+IMAGE_FOLDER = os.path.join(BASE_DIR, "simulation", "sample_images")
+INPUT_SIZE = 320
+RUNS_PER_IMAGE = 200
+
+
+def legacy_processed_detections(predictions, orig_size):
+    """Previous per-row implementation, kept as the reference."""
+    orig_h, orig_w = orig_size
+    scale_x, scale_y = orig_w / INPUT_SIZE, orig_h / INPUT_SIZE
+
+    boxes, confidences = [], []
+    for pred in predictions:
+        conf = float(pred[4])
+        if conf >= CONFIDENCE_THRESHOLD:
+            w, h = int(pred[2] * scale_x), int(pred[3] * scale_y)
+            x, y = int((pred[0] * scale_x) - w / 2), int((pred[1] * scale_y) - h / 2)
+            boxes.append([x, y, w, h])
+            confidences.append(conf)
+
+    indices = cv2.dnn.NMSBoxes(boxes, confidences, CONFIDENCE_THRESHOLD, NMS_THRESHOLD)
+    return indices, boxes, confidences
+
+
+def time_ms(fn, *args):
+    samples = []
+    for _ in range(RUNS_PER_IMAGE):
+        t_start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - t_start) * 1000)
+    return statistics.median(samples)
+
+
+def run_benchmark():
+    if not os.path.exists(MODEL_PATH):
+        print(f"Error: model not found at '{MODEL_PATH}'.")
+        return
+
+    session = ort.InferenceSession(MODEL_PATH, providers=['CPUExecutionProvider'])
+    input_name = session.get_inputs()[0].name
+
+    print(f"Post-processing benchmark: median of {RUNS_PER_IMAGE} runs per image")
+    print("-" * 60)
+
+    legacy_times, vector_times, mismatches = [], [], 0
+    for name in sorted(os.listdir(IMAGE_FOLDER)):
+        img = cv2.imread(os.path.join(IMAGE_FOLDER, name), cv2.IMREAD_COLOR)
+        if img is None:
+            continue
+        orig_size = img.shape[:2]
+        rgb = cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), (INPUT_SIZE, INPUT_SIZE), interpolation=cv2.INTER_AREA)
+        input_data = np.expand_dims((rgb.astype(np.float32) / 255.0).transpose(2, 0, 1), axis=0)
+        output = session.run(None, {input_name: input_data})[0][0]
+
+        indices, boxes, _ = legacy_processed_detections(output.T, orig_size)
+        expected = sorted(tuple(boxes[i]) for i in np.asarray(indices).flatten())
+        new_boxes, _ = get_processed_detections(output, orig_size, INPUT_SIZE, CONFIDENCE_THRESHOLD, NMS_THRESHOLD)
+        actual = sorted(tuple(b) for b in new_boxes.tolist())
+        identical = expected == actual
+        mismatches += not identical
+
+        legacy_ms = time_ms(legacy_processed_detections, output.T, orig_size)
+        vector_ms = time_ms(get_processed_detections, output, orig_size, INPUT_SIZE,
+                            CONFIDENCE_THRESHOLD, NMS_THRESHOLD)
+        legacy_times.append(legacy_ms)
+        vector_times.append(vector_ms)
+        print(f"{name:<24} | count {len(actual):>3} | legacy {legacy_ms:>7.3f} ms | "
+              f"vectorized {vector_ms:>7.3f} ms | {'identical' if identical else 'MISMATCH'}")
+
+    if legacy_times:
+        print("=" * 60)
+        print(f"Avg legacy:     {statistics.mean(legacy_times):.3f} ms/frame")
+        print(f"Avg vectorized: {statistics.mean(vector_times):.3f} ms/frame")
+        print(f"Speedup:        {statistics.mean(legacy_times) / statistics.mean(vector_times):.1f}x")
+        print(f"Mismatches:     {mismatches}")
+        print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,66 @@
+import io
+import os
+import statistics
+import sys
+import time
+
+import lz4.frame
+from PIL import Image
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src", "app"))
+
+from preprocessing import prepare_image  # noqa: E402
+from raw_frames import COMPRESSION_LZ4, COMPRESSION_NONE, HEADER, MAGIC, VERSION  # noqa: E402
+
+IMAGE_FOLDER = os.path.join(BASE_DIR, "simulation", "sample_images")
+INPUT_SIZE = 320
+JPEG_QUALITY = 85  # Same as simulation/simulate.py
+RUNS_PER_IMAGE = 200
+
+
+def client_frames(path):
+    """The three payloads a camera could send for one photo, as simulate.py builds them."""
+    with Image.open(path) as img:
+        img_rgb = img.convert("RGB")
+        resized = img_rgb.resize((INPUT_SIZE, INPUT_SIZE))
+        orig_w, orig_h = img_rgb.size
+
+    buf = io.BytesIO()
+    resized.save(buf, format="JPEG", quality=JPEG_QUALITY)
+    pixels = resized.tobytes()
+    raw = HEADER.pack(MAGIC, VERSION, COMPRESSION_NONE, 3, 0, INPUT_SIZE, INPUT_SIZE, orig_h, orig_w) + pixels
+    raw_lz4 = (HEADER.pack(MAGIC, VERSION, COMPRESSION_LZ4, 3, 0, INPUT_SIZE, INPUT_SIZE, orig_h, orig_w)
+               + lz4.frame.compress(pixels))
+    return {"jpeg": buf.getvalue(), "raw": raw, "raw-lz4": raw_lz4}
+
+
+def server_cpu_ms(payload):
+    """Median thread CPU time of the server-side prepare step for one frame."""
+    samples = []
+    for _ in range(RUNS_PER_IMAGE):
+        t_start = time.thread_time()
+        prepare_image(payload, INPUT_SIZE)
+        samples.append((time.thread_time() - t_start) * 1000)
+    return statistics.median(samples)
+
+
+def run_benchmark():
+    names = sorted(f for f in os.listdir(IMAGE_FOLDER) if f.lower().endswith(('.jpg', '.jpeg', '.png')))
+    cpu = {"jpeg": [], "raw": [], "raw-lz4": []}
+    size = {"jpeg": [], "raw": [], "raw-lz4": []}
+
+    for name in names:
+        for mode, payload in client_frames(os.path.join(IMAGE_FOLDER, name)).items():
+            cpu[mode].append(server_cpu_ms(payload))
+            size[mode].append(len(payload) / 1024)
+
+    print(f"Server ingest CPU per {INPUT_SIZE}x{INPUT_SIZE} frame ({len(names)} images, median of {RUNS_PER_IMAGE})")
+    print("-" * 60)
+    for mode in cpu:
+        print(f"{mode:<8} | {statistics.mean(cpu[mode]):>7.3f} ms CPU | {statistics.mean(size[mode]):>7.1f} KB upload")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
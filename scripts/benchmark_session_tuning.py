@@ -0,0 +1,74 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# The server modules live in src/app and are imported flat, like in the container
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src", "app"))
+
+from engines import OnnxEngine, cpu_quota  # noqa: E402
+from stand_in_model import build_stand_in_model  # noqa: E402
+
+MODEL_PATH = os.path.join(BASE_DIR, "src", "app", "models", "production", "inventory_monitor_quantized.onnx")
+INPUT_SIZE = 320
+BATCH_SIZES = (1, 8)
+RUNS = 100
+
+
+def measure(engine, batch):
+    """Cold first call, then p50/p95 of RUNS warm calls, in ms."""
+    t_start = time.perf_counter()
+    engine.infer_batch(batch)
+    cold_ms = (time.perf_counter() - t_start) * 1000
+
+    samples = []
+    for _ in range(RUNS):
+        t_start = time.perf_counter()
+        engine.infer_batch(batch)
+        samples.append((time.perf_counter() - t_start) * 1000)
+    return cold_ms, statistics.median(samples), statistics.quantiles(samples, n=20)[18]
+
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="ONNX Runtime latency per thread count, execution mode and IO binding")
+    parser.add_argument("--threads", type=int, nargs="*", help="Intra-op thread counts (default: 1..CPU quota)")
+    args = parser.parse_args()
+
+    quota = cpu_quota()
+    thread_counts = args.threads or sorted({1, *range(2, quota + 1, 2), quota})
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        model_path = MODEL_PATH
+        if not os.path.exists(model_path):
+            model_path = os.path.join(workdir, "stand_in.onnx")
+            build_stand_in_model(model_path, INPUT_SIZE)
+
+        print(f"Session tuning: {os.path.basename(model_path)}, CPU quota {quota} "
+              f"(os.cpu_count() {os.cpu_count()}), {RUNS} warm runs per case")
+        print("-" * 84)
+        print(f"{'Threads':>7} | {'Mode':<10} | {'IO bind':<7} | {'Batch':>5} | {'Cold':>9} | "
+              f"{'P50':>9} | {'P95':>9} | {'Per image':>9}")
+
+        for threads in thread_counts:
+            for mode in ("sequential", "parallel"):
+                for io_binding in (False, True):
+                    engine = OnnxEngine(model_path, "bench", threads, 1, mode, io_binding, max(BATCH_SIZES))
+                    engine.load()
+                    for batch_size in BATCH_SIZES:
+                        if engine.max_batch_size and batch_size > engine.max_batch_size:
+                            continue
+                        batch = rng.random((batch_size, 3, INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+                        cold, p50, p95 = measure(engine, batch)
+                        print(f"{threads:>7} | {mode:<10} | {'on' if io_binding else 'off':<7} | {batch_size:>5} | "
+                              f"{cold:>6.2f} ms | {p50:>6.2f} ms | {p95:>6.2f} ms | {p50 / batch_size:>6.2f} ms")
+    print("=" * 84)
+
+
+if __name__ == "__main__":
+    run_benchmark()
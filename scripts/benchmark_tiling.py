@@ -0,0 +1,115 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# The server modules live in src/app and are imported flat, like in the container
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src", "app"))
+
+from engines import OnnxEngine  # noqa: E402
+from postprocessing import CONFIDENCE_THRESHOLD, NMS_THRESHOLD, get_processed_detections  # noqa: E402
+from preprocessing import fill_input_tensor, prepare_image  # noqa: E402
+from stand_in_model import build_stand_in_model  # noqa: E402
+from tiling import merge_tiles, prepare_tiles  # noqa: E402
+
+MODEL_PATH = os.path.join(BASE_DIR, "src", "app", "models", "production", "inventory_monitor_quantized.onnx")
+IMAGE_FOLDER = os.path.join(BASE_DIR, "simulation", "sample_images")
+INPUT_SIZE = 320
+MAX_BATCH_SIZE = 8
+
+
+def batch_limit(engine):
+    """Largest batch to send: MAX_BATCH_SIZE, or 1 for a model exported with a fixed batch axis."""
+    return min(MAX_BATCH_SIZE, engine.max_batch_size or MAX_BATCH_SIZE)
+
+
+def infer(engine, views):
+    """Model output per view, run in batches of up to batch_limit like the server's batcher."""
+    outputs = []
+    step = batch_limit(engine)
+    for start in range(0, len(views), step):
+        chunk = views[start:start + step]
+        batch = np.empty((len(chunk), 3, INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+        for i, pixels in enumerate(chunk):
+            fill_input_tensor(pixels, batch[i])
+        outputs.extend(engine.infer_batch(batch).copy())
+    return outputs
+
+
+def single_shot(engine, contents):
+    prepared = prepare_image(contents, INPUT_SIZE)
+    output = infer(engine, [prepared.pixels])[0]
+    boxes, _ = get_processed_detections(output, prepared.orig_size, INPUT_SIZE)
+    return len(boxes), 1
+
+
+def tiled(engine, contents, max_dim, overlap):
+    tiled_image = prepare_tiles(contents, INPUT_SIZE, max_dim, overlap)
+    outputs = infer(engine, tiled_image.views)
+    boxes, _ = merge_tiles(outputs, tiled_image, INPUT_SIZE, CONFIDENCE_THRESHOLD, NMS_THRESHOLD)
+    return len(boxes), len(tiled_image.views)
+
+
+def measure(fn, runs, *args):
+    """(count, views, median ms) over `runs` end-to-end calls, decode included."""
+    samples = []
+    for _ in range(runs):
+        t_start = time.perf_counter()
+        count, views = fn(*args)
+        samples.append((time.perf_counter() - t_start) * 1000)
+    return count, views, statistics.median(samples)
+
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Single-shot vs. tiled inference on the sample images")
+    parser.add_argument("--images", default=IMAGE_FOLDER)
+    parser.add_argument("--max-dim", type=int, default=960, help="Longer side the image is tiled at (TILE_MAX_DIM)")
+    parser.add_argument("--overlap", type=int, default=64, help="Tile overlap in pixels (TILE_OVERLAP)")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        model_path = MODEL_PATH
+        if not os.path.exists(model_path):
+            # Latency is representative, detection counts are not
+            model_path = os.path.join(workdir, "stand_in.onnx")
+            build_stand_in_model(model_path, INPUT_SIZE)
+        engine = OnnxEngine(model_path, "int8", max_batch_size=MAX_BATCH_SIZE)
+        engine.load()
+        engine.warmup(INPUT_SIZE, batch_sizes=sorted({1, batch_limit(engine)}))
+
+        print(f"Tiling: {os.path.basename(model_path)}, tiles of {INPUT_SIZE} px at max {args.max_dim} px, "
+              f"overlap {args.overlap} px, median of {args.runs} runs")
+        print("-" * 92)
+        print(f"{'Image':<24} | {'Size':>11} | {'Views':>5} | {'Single':>9} | {'Tiled':>9} | "
+              f"{'Count':>5} | {'Tiled':>5} | {'Diff':>5}")
+
+        totals = {"single": 0.0, "tiled": 0.0, "views": 0, "images": 0}
+        for name in sorted(os.listdir(args.images)):
+            with open(os.path.join(args.images, name), "rb") as f:
+                contents = f.read()
+            height, width = prepare_image(contents, INPUT_SIZE).orig_size
+            count, _, single_ms = measure(single_shot, args.runs, engine, contents)
+            tiled_count, views, tiled_ms = measure(tiled, args.runs, engine, contents, args.max_dim, args.overlap)
+
+            totals["single"] += single_ms
+            totals["tiled"] += tiled_ms
+            totals["views"] += views
+            totals["images"] += 1
+            print(f"{name[:24]:<24} | {f'{width}x{height}':>11} | {views:>5} | {single_ms:>6.1f} ms | "
+                  f"{tiled_ms:>6.1f} ms | {count:>5} | {tiled_count:>5} | {tiled_count - count:>+5}")
+
+    images = totals["images"] or 1
+    print("-" * 92)
+    print(f"Mean: {totals['views'] / images:.1f} views per image (tiles + whole image), "
+          f"{totals['single'] / images:.1f} ms single-shot vs {totals['tiled'] / images:.1f} ms tiled")
+    print("=" * 92)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,126 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# The server modules live in src/app and are imported flat, like in the container
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src", "app"))
+
+from engines import OnnxEngine  # noqa: E402
+from postprocessing import get_processed_detections  # noqa: E402
+from preprocessing import fill_input_tensor, prepare_frame  # noqa: E402
+from stand_in_model import build_stand_in_model  # noqa: E402
+from tracking import BoxTracker  # noqa: E402
+
+MODEL_PATH = os.path.join(BASE_DIR, "src", "app", "models", "production", "inventory_monitor_quantized.onnx")
+PAN_IMAGE = os.path.join(BASE_DIR, "simulation", "sample_images", "03_warehouse_1.jpg")
+INPUT_SIZE = 320
+DETECT_EVERY = (5, 10, 15)
+
+
+def pan_frames(path, count, size=(1280, 720)):
+    """A slow camera pan across one large photo, standing in for a recorded shelf video."""
+    image = cv2.imread(path)
+    scale = 2400 / max(image.shape[:2])  # Large enough to pan a 720p window across
+    image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    span_x, span_y = image.shape[1] - size[0], image.shape[0] - size[1]
+    for i in range(count):
+        t = i / max(1, count - 1) * np.pi
+        x = int(span_x * (0.5 - 0.3 * np.cos(t)))
+        y = int(span_y * (0.5 - 0.1 * np.sin(2 * t)))
+        yield image[y:y + size[1], x:x + size[0]]
+
+
+def video_frames(path, count):
+    capture = cv2.VideoCapture(path)
+    for _ in range(count):
+        ok, frame = capture.read()
+        if not ok:
+            break
+        yield frame
+    capture.release()
+
+
+def detect(engine, prepared):
+    batch = np.empty((1, 3, INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+    fill_input_tensor(prepared.pixels, batch[0])
+    output = engine.infer_batch(batch)[0]
+    return get_processed_detections(output, prepared.orig_size, INPUT_SIZE)
+
+
+def run_sequence(engine, frames, detect_every):
+    """Per-frame counts and processing seconds (frame source excluded) per path: model vs. tracker."""
+    tracker = BoxTracker(detect_every) if detect_every > 1 else None
+    counts, seconds, frames_per_path = [], {"model": 0.0, "track": 0.0}, {"model": 0, "track": 0}
+    for frame in frames:
+        t_start = time.perf_counter()
+        prepared = prepare_frame(frame, INPUT_SIZE)
+        if tracker is not None and not tracker.needs_detection():
+            path = "track"
+            tracker.track(prepared.pixels)
+            count = len(tracker)
+        else:
+            path = "model"
+            boxes, scores = detect(engine, prepared)
+            count = len(boxes)
+            if tracker is not None:
+                tracker.update(prepared.pixels, boxes, scores, prepared.orig_size)
+                count = len(tracker)
+        seconds[path] += time.perf_counter() - t_start
+        frames_per_path[path] += 1
+        counts.append(count)
+    return np.array(counts), seconds, frames_per_path
+
+
+def per_frame_ms(seconds, frames, path):
+    return seconds[path] / frames[path] * 1000 if frames[path] else 0.0
+
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Detect-then-track vs. detecting on every frame")
+    parser.add_argument("--video", help="Recorded frame sequence (default: a synthetic pan over a sample photo)")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    def frames():
+        return video_frames(args.video, args.frames) if args.video else pan_frames(PAN_IMAGE, args.frames)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        model_path = MODEL_PATH
+        if not os.path.exists(model_path):
+            model_path = os.path.join(workdir, "stand_in.onnx")
+            build_stand_in_model(model_path, INPUT_SIZE)
+        engine = OnnxEngine(model_path, "int8", max_batch_size=1)
+        engine.load()
+        engine.warmup(INPUT_SIZE)
+
+        reference, seconds, frames_per_path = run_sequence(engine, frames(), 1)
+        reference_s = sum(seconds.values())
+        print(f"Tracking: {os.path.basename(model_path)}, {len(reference)} frames "
+              f"from {os.path.basename(args.video) if args.video else 'a synthetic pan'}")
+        print("-" * 104)
+        print(f"{'Mode':<16} | {'Model runs':>10} | {'Model frame':>11} | {'Track frame':>11} | {'Frames/s':>9} | "
+              f"{'Speedup':>7} | {'Count match':>11} | {'Mean |diff|':>11}")
+        print(f"{'detect every':<16} | {len(reference):>10} | "
+              f"{per_frame_ms(seconds, frames_per_path, 'model'):>8.2f} ms | {'-':>11} | "
+              f"{len(reference) / reference_s:>9.1f} | {1.0:>6.2f}x | {100.0:>10.1f}% | {0.0:>11.2f}")
+
+        for detect_every in DETECT_EVERY:
+            counts, seconds, frames_per_path = run_sequence(engine, frames(), detect_every)
+            elapsed = sum(seconds.values())
+            match = np.mean(counts == reference) * 100
+            diff = np.mean(np.abs(counts - reference))
+            print(f"{f'track, N={detect_every}':<16} | {frames_per_path['model']:>10} | "
+                  f"{per_frame_ms(seconds, frames_per_path, 'model'):>8.2f} ms | "
+                  f"{per_frame_ms(seconds, frames_per_path, 'track'):>8.2f} ms | {len(counts) / elapsed:>9.1f} | "
+                  f"{reference_s / elapsed:>6.2f}x | {match:>10.1f}% | {diff:>11.2f}")
+    print("=" * 104)
+
+
+if __name__ == "__main__":
+    run_benchmark()
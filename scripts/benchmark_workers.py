@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from load_test import DEFAULT_IMAGES, LatencyHistogram, Results, classify, run as run_load
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(BASE_DIR, "src", "app")
+DURATION_SECONDS = 15
+WARMUP_SECONDS = 3
+CLIENTS_PER_WORKER = 4
+CONSISTENCY_PROBES = 20
+# Shared-log contention: settings writers on every worker, plus a probe of event loop stalls
+CONTENTION_CLIENTS_PER_WORKER = 16
+CONTENTION_CAMERAS = 8
+LIVENESS_PROBE_INTERVAL = 0.05
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, port, workdir):
+    env = dict(
+        os.environ,
+        SHARED_STATE_PATH=os.path.join(workdir, "shared_state.db"),
+        HISTORY_DB_PATH=os.path.join(workdir, "history.db"),
+        # Every upload is unique, so neither shortcut hides the inference cost
+        DETECTION_CACHE_MB="0",
+        MOTION_THRESHOLD="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", APP_DIR, "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    # Ready once enough consecutive connections land on a worker whose model is warm
+    deadline, ready = time.time() + 60, 0
+    while ready < workers * 4:
+        if time.time() > deadline or server.poll() is not None:
+            server.kill()
+            raise SystemExit(f"Server with {workers} workers did not become ready")
+        try:
+            response = httpx.get(f"http://127.0.0.1:{port}/health/ready", timeout=2)
+            ready = ready + 1 if response.status_code == 200 else 0
+        except httpx.TransportError:
+            ready = 0
+        time.sleep(0.1)
+    return server
+
+
+def check_consistency(base_url):
+    """Changes thresholds through one connection, then reads /status through fresh ones."""
+    httpx.post(f"{base_url}/update-settings", json={"min": 1, "max": 4, "camera_id": "load-0"}, timeout=5)
+    snapshots = set()
+    for _ in range(CONSISTENCY_PROBES):
+        # A new client per probe, so the kernel can hand each connection to a different worker
+        status = httpx.get(f"{base_url}/status", params={"camera_id": "load-0"}, timeout=5).json()
+        snapshots.add(json.dumps(status, sort_keys=True))
+    return len(snapshots) == 1
+
+
+def load_args(url, concurrency):
+    return argparse.Namespace(
+        url=url, images=DEFAULT_IMAGES, max_images=0, rate=0.0, poisson=False, concurrency=concurrency,
+        duration=DURATION_SECONDS, warmup=WARMUP_SECONDS, timeout=30.0, cameras=4, camera_prefix="load-",
+        bust_cache=True,
+    )
+
+
+async def contend(base_url, clients, duration):
+    """Closed loop of /update-settings from `clients` connections, each one a shared-log append and sync.
+
+    Every worker takes SQLite's write lock in turn; a probe on /health/live
+    meanwhile measures how long an event loop stays blocked behind it.
+    """
+    results, probe = Results(), LatencyHistogram()
+    limits = httpx.Limits(max_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        t_end = time.perf_counter() + duration
+
+        async def writer(index):
+            settings = {"min": 1 + index % 3, "max": 10, "camera_id": f"contend-{index % CONTENTION_CAMERAS}"}
+            while time.perf_counter() < t_end:
+                t_start = time.perf_counter()
+                try:
+                    kind = classify(await client.post("/update-settings", json=settings))
+                except httpx.TransportError as e:
+                    kind = f"connection_{type(e).__name__}"
+                results.sent += 1
+                if kind:
+                    results.error(kind)
+                else:
+                    results.ok += 1
+                    results.latency.record((time.perf_counter() - t_start) * 1000)
+
+        async def prober():
+            while time.perf_counter() < t_end:
+                t_start = time.perf_counter()
+                await client.get("/health/live")
+                probe.record((time.perf_counter() - t_start) * 1000)
+                await asyncio.sleep(LIVENESS_PROBE_INTERVAL)
+
+        await asyncio.gather(prober(), *(writer(i) for i in range(clients)))
+    return results, probe
+
+
+def run_contention(max_workers):
+    print(f"\nShared-log contention: {CONTENTION_CLIENTS_PER_WORKER} /update-settings clients per worker, "
+          f"{DURATION_SECONDS}s per run")
+    print("-" * 72)
+    print(f"{'Workers':>7} | {'Writes':>12} | {'P50':>10} | {'P99':>10} | {'Live P99':>10} | {'Errors':>6} | Consistent")
+    for workers in range(1, max_workers + 1):
+        port = free_port()
+        with tempfile.TemporaryDirectory() as workdir:
+            server = start_server(workers, port, workdir)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                results, probe = asyncio.run(contend(base_url, CONTENTION_CLIENTS_PER_WORKER * workers,
+                                                     DURATION_SECONDS))
+                consistent = check_consistency(base_url)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+        latency, live = results.latency.summary(), probe.summary()
+        errors = sum(results.errors.values())
+        print(f"{workers:>7} | {results.ok / DURATION_SECONDS:>8.1f} w/s | {latency['p50']:>7.1f} ms | "
+              f"{latency['p99']:>7.1f} ms | {live['p99']:>7.1f} ms | {errors:>6} | {'yes' if consistent else 'NO'}")
+    print("=" * 72)
+
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description="Throughput of /predict with 1..N uvicorn workers")
+    parser.add_argument("--max-workers", type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument("--contention-only", action="store_true", help="Skip the /predict scaling runs")
+    args = parser.parse_args()
+    max_workers = args.max_workers
+    if args.contention_only:
+        run_contention(max_workers)
+        return
+
+    print(f"Worker scaling: closed loop, {CLIENTS_PER_WORKER} clients per worker, {DURATION_SECONDS}s per run "
+          f"({os.cpu_count()} CPUs)")
+    print("-" * 72)
+    print(f"{'Workers':>7} | {'Throughput':>14} | {'Scaling':>7} | {'P50':>10} | {'P99':>10} | {'Errors':>6} | Consistent")
+
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        port = free_port()
+        with tempfile.TemporaryDirectory() as workdir:
+            server = start_server(workers, port, workdir)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                args = load_args(f"{base_url}/predict", CLIENTS_PER_WORKER * workers)
+                _, results, elapsed = asyncio.run(run_load(args))
+                consistent = check_consistency(base_url)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+        throughput = results.ok / elapsed
+        baseline = baseline or throughput
+        latency = results.latency.summary()
+        errors = sum(results.errors.values())
+        print(f"{workers:>7} | {throughput:>10.1f} r/s | {throughput / baseline:>6.2f}x | "
+              f"{latency['p50']:>7.1f} ms | {latency['p99']:>7.1f} ms | {errors:>6} | {'yes' if consistent else 'NO'}")
+    print("=" * 72)
+    run_contention(max_workers)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,298 @@
+"""Async load generator for the /predict endpoint.
+
+Open-loop mode (--rate) schedules arrivals independently of responses and
+measures every latency from the *intended* send time, so a stalled server
+shows up in the tail instead of silently slowing the client down
+(coordinated omission). Without --rate it runs closed-loop with
+--concurrency workers, which measures peak throughput.
+
+Responses the server answered without running the model (detection cache,
+motion gating, QoS throttling) are counted per reason and also left out of
+a separate inferred-only latency summary. --bust-cache only defeats the
+cache; for model-only numbers run the server with MOTION_THRESHOLD=0 and
+LATENCY_TARGET_MS=0 (both the defaults), as benchmark_workers.py does.
+
+    python scripts/load_test.py --url http://127.0.0.1:8000/predict --rate 20 --duration 60
+    python scripts/load_test.py --concurrency 16 --duration 30 --output results/c16.json
+
+Dependencies: pip install -r requirements/requirements-bench.txt
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_URL = "http://127.0.0.1:8000/predict"
+DEFAULT_IMAGES = os.path.join(BASE_DIR, "simulation", "sample_images")
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png")
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """HDR-style histogram: log-linear buckets with ~1% relative error, 1 us to 1 h.
+
+    Memory stays constant however long the run is, and percentiles are
+    exact to the bucket width.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max_us = 0
+        self.sum_us = 0
+
+    def record(self, ms):
+        us = max(1, int(ms * 1000))
+        exponent = us.bit_length() - 1
+        # 128 sub-buckets per power of two above 256 us, exact below
+        sub = us >> (exponent - 7) if exponent > 7 else us
+        key = (exponent, sub)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+        self.sum_us += us
+        self.max_us = max(self.max_us, us)
+
+    @staticmethod
+    def _upper_bound_us(key):
+        exponent, sub = key
+        return ((sub + 1) << (exponent - 7)) - 1 if exponent > 7 else sub
+
+    def percentile(self, p):
+        if not self.total:
+            return 0.0
+        target = max(1, math.ceil(self.total * p / 100))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= target:
+                return min(self._upper_bound_us(key), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self):
+        result = {f"p{p:g}": round(self.percentile(p), 2) for p in PERCENTILES}
+        result["mean"] = round(self.sum_us / self.total / 1000, 2) if self.total else 0.0
+        result["max"] = round(self.max_us / 1000, 2)
+        result["count"] = self.total
+        return result
+
+
+class Results:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.server = {}  # Server-reported stage -> LatencyHistogram
+        self.inferred = LatencyHistogram()  # Successes that actually ran the model
+        self.reused = {}  # Server's reuse reason (cache, motion, qos) -> count
+        self.errors = {}
+        self.ok = 0
+        self.sent = 0
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+def load_images(folder, limit):
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_SUFFIXES))
+    if not names:
+        raise SystemExit(f"No images found in '{folder}'")
+    images = []
+    for name in names[:limit or None]:
+        with open(os.path.join(folder, name), "rb") as f:
+            images.append((name, f.read()))
+    return images
+
+
+def classify(response):
+    """Error class for a response, or None if it counts as a success."""
+    if response.status_code == 503:
+        return "overloaded_503"
+    if response.status_code != 200:
+        return f"http_{response.status_code}"
+    try:
+        if not response.json().get("success", False):
+            return "app_error"
+    except ValueError:
+        return "invalid_json"
+    return None
+
+
+async def send_one(client, args, images, index, scheduled, results, record):
+    name, contents = images[index % len(images)]
+    if args.bust_cache:
+        # Trailing bytes after the image end marker change the content hash but not the pixels
+        contents = contents + index.to_bytes(8, "little")
+    camera_id = f"{args.camera_prefix}{index % args.cameras}"
+    try:
+        response = await client.post(
+            args.url, files={"file": (name, contents, "image/jpeg")}, data={"camera_id": camera_id}
+        )
+        kind = classify(response)
+    except httpx.TimeoutException:
+        response, kind = None, "timeout"
+    except httpx.TransportError as e:
+        response, kind = None, f"connection_{type(e).__name__}"
+    latency_ms = (time.perf_counter() - scheduled) * 1000
+
+    if not record:
+        return
+    results.sent += 1
+    if kind:
+        results.error(kind)
+        return
+    results.ok += 1
+    results.latency.record(latency_ms)
+    body = response.json()
+    reused = body.get("reused")
+    if reused:
+        results.reused[reused] = results.reused.get(reused, 0) + 1
+    else:
+        results.inferred.record(latency_ms)
+    for stage, ms in body.get("timings_ms", {}).items():
+        results.server.setdefault(stage, LatencyHistogram()).record(ms)
+
+
+async def open_loop(client, args, images, results, t_start, t_record, t_end):
+    """Arrivals at a fixed or Poisson rate; concurrency only caps in-flight requests."""
+    slots = asyncio.Semaphore(args.concurrency)
+    tasks = set()
+    scheduled = t_start
+    index = 0
+
+    async def guarded(index, scheduled):
+        async with slots:
+            await send_one(client, args, images, index, scheduled, results, scheduled >= t_record)
+
+    while scheduled < t_end:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(guarded(index, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        index += 1
+        gap = random.expovariate(args.rate) if args.poisson else 1.0 / args.rate
+        scheduled += gap
+    await asyncio.gather(*tasks)
+
+
+async def closed_loop(client, args, images, results, t_start, t_record, t_end):
+    counter = iter(range(1 << 62))
+
+    async def worker():
+        while time.perf_counter() < t_end:
+            scheduled = time.perf_counter()
+            await send_one(client, args, images, next(counter), scheduled, results, scheduled >= t_record)
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+
+async def run(args):
+    images = load_images(args.images, args.max_images)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = Results()
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        t_start = time.perf_counter()
+        t_record = t_start + args.warmup
+        t_end = t_record + args.duration
+        loop = open_loop if args.rate else closed_loop
+        await loop(client, args, images, results, t_start, t_record, t_end)
+        elapsed = time.perf_counter() - t_record
+
+    return images, results, elapsed
+
+
+def report(args, images, results, elapsed):
+    return {
+        "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "url": args.url,
+            "mode": "open" if args.rate else "closed",
+            "rate": args.rate,
+            "poisson": args.poisson,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "images": len(images),
+            "cameras": args.cameras,
+            "bust_cache": args.bust_cache,
+        },
+        "client": {"host": platform.node(), "python": platform.python_version()},
+        "requests": results.sent,
+        "successes": results.ok,
+        "throughput_rps": round(results.ok / elapsed, 2) if elapsed > 0 else 0.0,
+        "errors": dict(sorted(results.errors.items())),
+        "reused": dict(sorted(results.reused.items())),
+        "latency_ms": results.latency.summary(),
+        "inferred_latency_ms": results.inferred.summary(),
+        "server_timings_ms": {stage: h.summary() for stage, h in sorted(results.server.items())},
+    }
+
+
+def print_report(result):
+    config = result["config"]
+    target = f"{config['rate']} req/s offered" if config["mode"] == "open" else f"{config['concurrency']} workers"
+    print("=" * 60)
+    print(f"{config['url']} | {config['mode']}-loop, {target}, {config['duration_s']}s")
+    print("=" * 60)
+    print(f"Requests:   {result['requests']} ({result['successes']} ok)")
+    print(f"Throughput: {result['throughput_rps']:.1f} req/s")
+    for kind, count in result["errors"].items():
+        print(f"  error {kind}: {count}")
+    print("-" * 60)
+    latency = result["latency_ms"]
+    print("Latency ms: " + " | ".join(f"{p} {latency[p]:.1f}" for p in ("p50", "p90", "p99", "p99.9", "max")))
+    if result["reused"]:
+        # Answered without the model: the numbers above are not pure inference
+        print("Reused:     " + " | ".join(f"{reason} {count}" for reason, count in result["reused"].items()))
+        inferred = result["inferred_latency_ms"]
+        print(f"Inferred:   {inferred['count']} | " +
+              " | ".join(f"{p} {inferred[p]:.1f}" for p in ("p50", "p90", "p99", "max")))
+    for stage, summary in result["server_timings_ms"].items():
+        print(f"  server {stage:<12} p50 {summary['p50']:>8.2f} | p99 {summary['p99']:>8.2f}")
+    print("=" * 60)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="Folder of images to upload in rotation")
+    parser.add_argument("--max-images", type=int, default=0, help="Use only the first N images (0 = all)")
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop arrivals per second (0 = closed loop)")
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times instead of fixed")
+    parser.add_argument("--concurrency", type=int, default=8, help="Workers (closed loop) or in-flight cap (open)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds sent before measuring")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--cameras", type=int, default=1, help="Spread requests over N camera ids")
+    parser.add_argument("--camera-prefix", default="load-")
+    parser.add_argument("--bust-cache", action="store_true",
+                        help="Make every upload unique to bypass the detection cache; motion gating and QoS "
+                             "throttling are server settings (MOTION_THRESHOLD, LATENCY_TARGET_MS) and are "
+                             "reported under 'reused'")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    images, results, elapsed = asyncio.run(run(args))
+    result = report(args, images, results, elapsed)
+    print_report(result)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
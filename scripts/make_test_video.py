@@ -0,0 +1,49 @@
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_FOLDER = os.path.join(BASE_DIR, "simulation", "sample_images")
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png")
+
+
+def make_video(path, images, size, fps, seconds_per_image):
+    """Writes the images as an MJPEG AVI, each held for `seconds_per_image`, to stand in for a camera."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    if not writer.isOpened():
+        raise SystemExit(f"Cannot write {path}")
+    frames = 0
+    for name in images:
+        frame = cv2.resize(cv2.imread(name), size, interpolation=cv2.INTER_AREA)
+        for i in range(max(1, round(fps * seconds_per_image))):
+            # A little sensor noise, so consecutive frames are not byte-identical
+            noise = np.random.default_rng(frames).integers(-2, 3, frame.shape, dtype=np.int16)
+            writer.write(np.clip(frame + noise, 0, 255).astype(np.uint8))
+            frames += 1
+    writer.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Video file from the sample images, for STREAMS=camera=<file>")
+    parser.add_argument("output", nargs="?", default="shelf_camera.avi")
+    parser.add_argument("--images", default=IMAGE_FOLDER)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--seconds-per-image", type=float, default=2.0)
+    args = parser.parse_args()
+
+    images = sorted(
+        os.path.join(args.images, name) for name in os.listdir(args.images) if name.lower().endswith(IMAGE_SUFFIXES)
+    )
+    frames = make_video(args.output, images, (args.width, args.height), args.fps, args.seconds_per_image)
+    print(f"Wrote {args.output}: {frames} frames at {args.fps:g} fps ({frames / args.fps:.1f}s) "
+          f"from {len(images)} images")
+    print(f"Serve it with STREAMS=shelf-cam={os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Offline micro-benchmarks for the inference hot path.
+
+Runs in-process with no server or network: decode, preprocessing,
+session.run, post-processing and update_inventory_status on the images in
+simulation/sample_images. When the production model is not checked out, a
+small generated ONNX model with the same (batch, 5, 2100) output is used.
+
+    python scripts/microbench.py                          # run and print
+    python scripts/microbench.py --save scripts/microbench_baseline.json
+    python scripts/microbench.py --compare --threshold 0.25
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import onnxruntime as ort
+
+# The server modules live in src/app and are imported flat, like in the container
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src", "app"))
+os.environ.setdefault("HISTORY_DB_PATH", "")  # update_inventory_status must not touch SQLite
+
+import main  # noqa: E402
+from postprocessing import get_processed_detections  # noqa: E402
+from preprocessing import decode_image, fill_input_tensor, prepare_image  # noqa: E402
+from stand_in_model import build_stand_in_model  # noqa: E402
+
+MODEL_PATH = os.path.join(BASE_DIR, "src", "app", "models", "production", "inventory_monitor_quantized.onnx")
+IMAGE_FOLDER = os.path.join(BASE_DIR, "simulation", "sample_images")
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "scripts", "microbench_baseline.json")
+INPUT_SIZE = main.INPUT_SIZE
+BATCH_SIZE = main.BATCH_MAX_SIZE
+ROUNDS = 15
+MIN_ROUND_SECONDS = 0.05
+
+
+def load_session(choice, workdir):
+    if choice == "production" or (choice == "auto" and os.path.exists(MODEL_PATH)):
+        path, label = MODEL_PATH, "production"
+    else:
+        path, label = os.path.join(workdir, "stand_in.onnx"), "stand-in"
+        build_stand_in_model(path)
+    options = ort.SessionOptions()
+    # One thread keeps run-to-run noise low and matches the container
+    options.intra_op_num_threads = 1
+    options.inter_op_num_threads = 1
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"]), label
+
+
+def measure(fn, rounds):
+    """Per-call ms for each round, with the loop count calibrated so a round lasts MIN_ROUND_SECONDS."""
+    fn()
+    loops, elapsed = 1, 0.0
+    while True:
+        t_start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t_start
+        if elapsed >= MIN_ROUND_SECONDS:
+            break
+        loops *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            t_start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter() - t_start) * 1000 / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def summarize(samples):
+    median = statistics.median(samples)
+    mad = statistics.median(abs(s - median) for s in samples)
+    return {
+        "median_ms": round(median, 4),
+        "min_ms": round(min(samples), 4),
+        "mad_pct": round(100 * mad / median, 2) if median else 0.0,
+        "rounds": len(samples),
+    }
+
+
+def benchmark_cases(session):
+    """(name, callable) pairs; each callable processes every sample image once."""
+    images = []
+    for name in sorted(os.listdir(IMAGE_FOLDER)):
+        with open(os.path.join(IMAGE_FOLDER, name), "rb") as f:
+            images.append(f.read())
+
+    input_name = session.get_inputs()[0].name
+    prepared = [prepare_image(contents, INPUT_SIZE) for contents in images]
+    tensors = np.empty((len(prepared), 3, INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+    for i, item in enumerate(prepared):
+        fill_input_tensor(item.pixels, tensors[i])
+    outputs = [session.run(None, {input_name: tensors[i:i + 1]})[0][0] for i in range(len(prepared))]
+    batch = np.resize(tensors, (BATCH_SIZE, 3, INPUT_SIZE, INPUT_SIZE))
+    counts = [len(get_processed_detections(out, item.orig_size, INPUT_SIZE)[0]) for out, item in zip(outputs, prepared)]
+
+    def decode():
+        for contents in images:
+            decode_image(contents, INPUT_SIZE)
+
+    def prepare():
+        for contents in images:
+            prepare_image(contents, INPUT_SIZE)
+
+    def fill():
+        for i, item in enumerate(prepared):
+            fill_input_tensor(item.pixels, tensors[i])
+
+    def run_single():
+        for i in range(len(prepared)):
+            session.run(None, {input_name: tensors[i:i + 1]})
+
+    def run_batch():
+        session.run(None, {input_name: batch})
+
+    def postprocess():
+        for out, item in zip(outputs, prepared):
+            get_processed_detections(out, item.orig_size, INPUT_SIZE)
+
+    async def update_all():
+        for count in counts:
+            await main.update_inventory_status(count, "microbench")
+
+    # One loop for every round, so its setup stays out of the timings
+    loop = asyncio.new_event_loop()
+
+    def update_status():
+        loop.run_until_complete(update_all())
+
+    cases = [
+        ("decode", decode),
+        ("prepare_image", prepare),
+        ("fill_input_tensor", fill),
+        ("session_run_b1", run_single),
+        ("postprocess", postprocess),
+        ("update_inventory_status", update_status),
+    ]
+    if session.get_inputs()[0].shape[0] != 1:
+        cases.insert(4, (f"session_run_b{BATCH_SIZE}", run_batch))
+    return cases, len(images)
+
+
+def compare(results, baseline, threshold):
+    """Prints the change per case; returns the names that regressed beyond `threshold`."""
+    if baseline.get("model") != results["model"]:
+        print(f"Warning: baseline used the {baseline.get('model')} model, this run used {results['model']}")
+    regressions = []
+    print("-" * 72)
+    print(f"{'case':<26} {'baseline ms':>12} {'current ms':>12} {'change':>9}")
+    for name, current in results["cases"].items():
+        previous = baseline["cases"].get(name)
+        if previous is None:
+            print(f"{name:<26} {'-':>12} {current['median_ms']:>12.3f}      new")
+            continue
+        change = current["median_ms"] / previous["median_ms"] - 1
+        best_change = current["min_ms"] / previous["min_ms"] - 1
+        # Shared CPUs make single runs noisy: the median and the best round must
+        # both be slower, and by more than three times either run's spread
+        noise = max(current["mad_pct"], previous["mad_pct"]) * 3 / 100
+        regressed = min(change, best_change) > max(threshold, noise)
+        regressions += [name] if regressed else []
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:<26} {previous['median_ms']:>12.3f} {current['median_ms']:>12.3f} {change:>+8.1%} {flag}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--model", choices=("auto", "production", "stand-in"), default="auto",
+                        help="auto uses the production model when it is present")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--only", nargs="*", help="Run only these cases")
+    parser.add_argument("--save", help="Write results as JSON (e.g. a new baseline)")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative slowdown flagged as a regression")
+    return parser.parse_args()
+
+
+def main_cli():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        session, model = load_session(args.model, workdir)
+        cases, image_count = benchmark_cases(session)
+
+        print(f"Micro-benchmarks: {model} model, {image_count} images per call, median of {args.rounds} rounds")
+        print("-" * 72)
+        results = {
+            "model": model,
+            "images": image_count,
+            "machine": {
+                "python": platform.python_version(),
+                "onnxruntime": ort.__version__,
+                "numpy": np.__version__,
+                "processor": platform.machine(),
+                "cpus": os.cpu_count(),
+            },
+            "cases": {},
+        }
+        for name, fn in cases:
+            if args.only and name not in args.only:
+                continue
+            summary = summarize(measure(fn, args.rounds))
+            results["cases"][name] = summary
+            print(f"{name:<26} {summary['median_ms']:>10.3f} ms  (min {summary['min_ms']:.3f}, "
+                  f"±{summary['mad_pct']:.1f}%)")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print("=" * 72)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -15,6 +15,7 @@ docker run -d \
   -p 8000:8000 \
   --memory="2g" \
   --cpus="1.0" \
+  -e MODEL_MODE="torch" \
   --name $CONTAINER_NAME \
   $IMAGE_NAME
 
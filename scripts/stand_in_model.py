@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def build_stand_in_model(path, input_size=320):
+    """Writes a tiny YOLOv8-shaped model: (batch, 3, S, S) -> (batch, 5, anchors).
+
+    Three strided convolutions stand in for the stride 8/16/32 detection
+    heads, so the anchor count and layout match the real export (2100
+    anchors at 320).
+    """
+    try:
+        import onnx
+        from onnx import TensorProto, helper, numpy_helper
+    except ImportError:
+        raise SystemExit("Generating the stand-in model requires the 'onnx' package")
+
+    rng = np.random.default_rng(0)
+    initializers, nodes, heads = [], [], []
+    for i, stride in enumerate((8, 16, 32)):
+        weights = rng.normal(0, 0.02, (5, 3, stride, stride)).astype(np.float32)
+        initializers.append(numpy_helper.from_array(weights, f"w{i}"))
+        nodes.append(helper.make_node("Conv", ["images", f"w{i}"], [f"c{i}"],
+                                      kernel_shape=[stride, stride], strides=[stride, stride]))
+        nodes.append(helper.make_node("Reshape", [f"c{i}", "shape"], [f"r{i}"]))
+        heads.append(f"r{i}")
+    initializers.append(numpy_helper.from_array(np.array([0, 5, -1], np.int64), "shape"))
+    # Sigmoid output scaled to pixel boxes and a confidence that leaves a few dozen candidates
+    scale = np.array([input_size, input_size, 60, 60, 0.5], np.float32).reshape(1, 5, 1)
+    initializers.append(numpy_helper.from_array(scale, "scale"))
+    nodes.append(helper.make_node("Concat", heads, ["concat"], axis=2))
+    nodes.append(helper.make_node("Sigmoid", ["concat"], ["sigmoid"]))
+    nodes.append(helper.make_node("Mul", ["sigmoid", "scale"], ["output0"]))
+
+    graph = helper.make_graph(
+        nodes, "stand_in", [helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, input_size, input_size])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, ["batch", 5, "anchors"])], initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, path)
@@ -1,6 +1,7 @@
 import os
 import time
 import io
+import struct
 import requests
 from PIL import Image
 
@@ -9,6 +10,35 @@ API_URL = "http://inventory-monitor-denis.duckdns.org:8000/predict"
 IMAGE_DIR = "sample_images"
 TARGET_FPS = 1.0
 INPUT_SIZE = 320
+CAMERA_ID = "default"
+# "jpeg" re-encodes the resized frame, "raw" sends the 320x320 RGB pixels as they are,
+# "raw-lz4" compresses them first (needs the lz4 package)
+SEND_MODE = "jpeg"
+
+# Raw frame header understood by the server (see src/app/raw_frames.py)
+RAW_HEADER = struct.Struct("<4sBBBBHHII")
+
+
+def encode_raw_frame(img_resized, orig_size, compress=False):
+    payload = img_resized.tobytes()
+    compression = 0
+    if compress:
+        import lz4.frame
+        payload = lz4.frame.compress(payload)
+        compression = 1
+    width, height = img_resized.size
+    orig_w, orig_h = orig_size
+    header = RAW_HEADER.pack(b"INVR", 1, compression, 3, 0, height, width, orig_h, orig_w)
+    return header + payload
+
+
+def encode_frame(img_rgb, img_resized):
+    if SEND_MODE == "jpeg":
+        buf = io.BytesIO()
+        img_resized.save(buf, format="JPEG", quality=85)
+        return buf.getvalue(), "image/jpeg"
+    data = encode_raw_frame(img_resized, img_rgb.size, compress=SEND_MODE == "raw-lz4")
+    return data, "application/octet-stream"
 
 
 def run_simulation():
@@ -22,7 +52,7 @@ def run_simulation():
         print("No images found to send.")
         return
 
-    print(f"Starting simulation: {len(images)} images at {TARGET_FPS} FPS")
+    print(f"Starting simulation: {len(images)} images at {TARGET_FPS} FPS ({SEND_MODE} frames)")
     print(f"Target: {API_URL}\n")
 
     for filename in images:
@@ -35,12 +65,9 @@ def run_simulation():
                 img_rgb = img.convert("RGB")
                 img_resized = img_rgb.resize((INPUT_SIZE, INPUT_SIZE))
 
-                buf = io.BytesIO()
-                img_resized.save(buf, format="JPEG", quality=85)
-                buf.seek(0)
-
-                files = {"file": (filename, buf, "image/jpeg")}
-                response = requests.post(API_URL, files=files, timeout=10)
+                data, content_type = encode_frame(img_rgb, img_resized)
+                files = {"file": (filename, data, content_type)}
+                response = requests.post(API_URL, files=files, data={"camera_id": CAMERA_ID}, timeout=10)
 
             duration = (time.perf_counter() - start_time) * 1000
 
@@ -0,0 +1,55 @@
+import io
+import tarfile
+import zipfile
+from pathlib import PurePosixPath
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+MAX_MEMBER_BYTES = 50 * 1024 * 1024
+
+
+def is_archive(filename, contents):
+    name = (filename or "").lower()
+    if name.endswith((".zip", ".tar", ".tar.gz", ".tgz")):
+        return True
+    return contents[:4] == b"PK\x03\x04"
+
+
+def extract_images(contents, max_members, max_total_bytes=None):
+    """Image members of a zip or tar archive as (name, bytes), in archive order.
+
+    Non-image members are skipped; raises ValueError when the archive holds
+    more than `max_members` images, more than `max_total_bytes` of them
+    uncompressed, or is not a readable zip/tar. Sizes are checked before a
+    member is read.
+    """
+    images = []
+    total = 0
+
+    def add(name, size, read):
+        nonlocal total
+        if PurePosixPath(name).suffix.lower() not in IMAGE_SUFFIXES:
+            return
+        if size > MAX_MEMBER_BYTES:
+            raise ValueError(f"Archive member too large: {name}")
+        if len(images) >= max_members:
+            raise ValueError(f"Archive holds more than {max_members} images")
+        total += size
+        if max_total_bytes is not None and total > max_total_bytes:
+            raise ValueError(f"Archive images exceed {max_total_bytes // (1024 * 1024)} MB in total")
+        images.append((name, read()))
+
+    if zipfile.is_zipfile(io.BytesIO(contents)):
+        with zipfile.ZipFile(io.BytesIO(contents)) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    add(info.filename, info.file_size, lambda: archive.read(info))
+        return images
+
+    try:
+        with tarfile.open(fileobj=io.BytesIO(contents)) as archive:
+            for member in archive:
+                if member.isfile():
+                    add(member.name, member.size, lambda: archive.extractfile(member).read())
+    except tarfile.TarError as e:
+        raise ValueError(f"Unreadable archive: {e}")
+    return images
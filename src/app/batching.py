@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from preprocessing import fill_input_tensor
+from workers import OverloadedError, summarize_waits
+
+
+class MicroBatcher:
+    """Collects concurrent inference requests and runs them as one engine batch.
+
+    Requests are gathered until either `max_batch_size` items are waiting or
+    `max_wait_ms` has passed since the first one arrived. The images are
+    written straight into a preallocated NCHW float32 buffer that is reused
+    across batches, the batch goes through a single `engine.infer_batch` on
+    a dedicated thread and each caller gets back its own slice of the first
+    output. Images of different sizes (see qos) collected together run as
+    one batch per size. The queue is bounded: when `max_queue_size`
+    requests are already waiting, `infer` raises OverloadedError.
+    """
+
+    def __init__(self, engine, input_size, max_batch_size=8, max_wait_ms=5.0, max_queue_size=32):
+        self.engine = engine
+        self.max_batch_size = max(1, min(max_batch_size, engine.max_batch_size or max_batch_size))
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.rejected = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.wait_times = deque(maxlen=256)
+
+        # Only touched by the single inference thread, so reuse is safe; one per input size
+        self._input_buffers = {input_size: self._allocate_input(input_size)}
+        self.fill_times = deque(maxlen=256)
+
+        self._queue = None
+        self._worker = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference-batch")
+
+    def _allocate_input(self, input_size):
+        return np.empty((self.max_batch_size, 3, input_size, input_size), dtype=np.float32)
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+    async def infer(self, pixels):
+        """Queues one model-sized (H, W, 3) uint8 RGB image.
+
+        Returns its (5, N) output slice and the per-stage times in ms this
+        request spent in the batcher (queue wait, buffer fill, model run).
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((pixels, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise OverloadedError("Inference queue is full")
+        return await future
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self.max_queue_size,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+            "fill_ms_avg": round(float(np.mean(self.fill_times)) * 1000, 3) if self.fill_times else 0.0,
+            **summarize_waits(self.wait_times),
+        }
+
+    async def _collect(self):
+        items = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    def _run_batch(self, images):
+        t_start = time.perf_counter()
+        input_size = images[0].shape[0]
+        if input_size not in self._input_buffers:
+            self._input_buffers[input_size] = self._allocate_input(input_size)
+        batch = self._input_buffers[input_size][:len(images)]
+        for i, pixels in enumerate(images):
+            fill_input_tensor(pixels, batch[i])
+        t_filled = time.perf_counter()
+        output = self.engine.infer_batch(batch)
+        self.fill_times.append(t_filled - t_start)
+        return output, t_filled - t_start, time.perf_counter() - t_filled
+
+    async def _run_forever(self):
+        while True:
+            items = await self._collect()
+            groups = {}
+            for item in items:
+                groups.setdefault(item[0].shape[0], []).append(item)
+            for group in groups.values():
+                await self._run_group(group)
+
+    async def _run_group(self, items):
+        started = time.perf_counter()
+        self.wait_times.extend(started - enqueued for _, _, enqueued in items)
+        self.batches += 1
+        self.batched_items += len(items)
+
+        images = [pixels for pixels, _, _ in items]
+        try:
+            output, fill_s, run_s = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._run_batch, images
+            )
+        except Exception as e:
+            for _, future, _ in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Engines with IO binding overwrite their output buffer on the next batch
+        if self.engine.reuses_output:
+            output = output.copy()
+        for i, (_, future, enqueued) in enumerate(items):
+            if not future.done():
+                timings = {
+                    "queue": (started - enqueued) * 1000,
+                    "preprocess": fill_s * 1000,
+                    "inference": run_s * 1000,
+                }
+                future.set_result((output[i], timings))
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from collections import deque
+
+
+def format_sse(event, payload):
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class _Channel:
+    """Backlog, sequence number and wake-up event of one camera's subscribers."""
+
+    def __init__(self, camera_id, backlog):
+        self.camera_id = camera_id
+        self.events = deque(maxlen=backlog)
+        self.seq = 0
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+
+
+class Subscription:
+    """One client's reserved slot on a channel; `release` frees it once, however often it is called."""
+
+    def __init__(self, broadcaster, channel):
+        self.broadcaster = broadcaster
+        self.channel = channel
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.broadcaster._release(self.channel)
+
+
+class StatusBroadcaster:
+    """Fan-out of status deltas to the dashboards streaming each camera.
+
+    Each camera with subscribers has its own channel: a change is
+    serialized once and appended to that camera's backlog, and only its
+    subscribers wake and read from it with their own cursor. A subscriber
+    that falls further behind than the backlog gets a fresh snapshot
+    instead of the missed deltas, so slow clients are coalesced rather than
+    buffered without bound. Changes to cameras nobody watches are dropped.
+    """
+
+    def __init__(self, backlog=64, max_subscribers=100, keepalive_seconds=15.0):
+        self.backlog = backlog
+        self.max_subscribers = max_subscribers
+        self.keepalive_seconds = keepalive_seconds
+        self.subscribers = 0
+        self.published = 0
+        self.resyncs = 0
+        self._channels = {}
+
+    def publish(self, camera_id, delta):
+        """Queues one delta for all subscribers of `camera_id`. Must run on the event loop."""
+        self.published += 1
+        channel = self._channels.get(camera_id)
+        if channel is None:
+            return
+        channel.seq += 1
+        channel.events.append((channel.seq, format_sse("update", json.dumps(delta))))
+
+        changed, channel.changed = channel.changed, asyncio.Event()
+        changed.set()
+
+    def subscribe(self, camera_id):
+        """Reserves a subscriber slot for the camera, or returns None when all are taken.
+
+        The slot is counted right away, so concurrent connects can't all
+        pass the check. `stream` releases it when the client goes away; a
+        stream that never started must be released by the caller.
+        """
+        if self.subscribers >= self.max_subscribers:
+            return None
+        channel = self._channels.get(camera_id)
+        if channel is None:
+            channel = self._channels[camera_id] = _Channel(camera_id, self.backlog)
+        channel.subscribers += 1
+        self.subscribers += 1
+        return Subscription(self, channel)
+
+    def _release(self, channel):
+        self.subscribers -= 1
+        channel.subscribers -= 1
+        if channel.subscribers == 0:
+            del self._channels[channel.camera_id]
+
+    async def stream(self, subscription, snapshot):
+        """Yields SSE messages for one client: a snapshot, then deltas as they happen.
+
+        `subscription` comes from `subscribe`. `snapshot` is a callable
+        returning the camera's full state.
+        """
+        channel = subscription.channel
+        try:
+            cursor = channel.seq
+            yield format_sse("snapshot", json.dumps(snapshot()))
+
+            while True:
+                if cursor == channel.seq:
+                    try:
+                        await asyncio.wait_for(channel.changed.wait(), timeout=self.keepalive_seconds)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+                        continue
+
+                if channel.events[0][0] > cursor + 1:
+                    # Missed deltas already left the backlog: resync from current state
+                    self.resyncs += 1
+                    cursor = channel.seq
+                    yield format_sse("snapshot", json.dumps(snapshot()))
+                    continue
+
+                pending = [message for seq, message in channel.events if seq > cursor]
+                cursor = channel.seq
+                yield "".join(pending)
+        finally:
+            subscription.release()
+
+    def stats(self):
+        return {"subscribers": self.subscribers, "published": self.published, "resyncs": self.resyncs,
+                "channels": len(self._channels)}
@@ -0,0 +1,77 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def content_key(contents):
+    """Fast 128-bit digest of the uploaded bytes."""
+    return hashlib.blake2b(contents, digest_size=16).digest()
+
+
+class DetectionCache:
+    """LRU cache of detection results keyed by the hash of the uploaded bytes.
+
+    Size is bounded by the memory of the stored arrays (`max_bytes`) and
+    entries expire after `ttl_seconds`. Only used from the event loop, so
+    it needs no locking.
+    """
+
+    def __init__(self, max_bytes, ttl_seconds):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, size, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, boxes, scores):
+        size = boxes.nbytes + scores.nbytes + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = ((boxes, scores), size, time.monotonic() + self.ttl_seconds)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,227 @@
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+
+
+def cpu_quota():
+    """CPUs this process may use: the cgroup quota if one is set, else the CPU affinity.
+
+    Fargate and `docker run --cpus` limit CPU time through the cgroup while
+    os.cpu_count() still reports every core of the host, which oversubscribes
+    thread pools sized from it.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()  # cgroup v2
+        limit = None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        try:  # cgroup v1
+            quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+            period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+            limit = quota / period if quota > 0 else None
+        except (OSError, ValueError):
+            limit = None
+    if limit is not None:
+        cpus = min(cpus, max(1, math.floor(limit)))
+    return cpus
+
+
+class InferenceEngine(ABC):
+    """Common interface for the model backends.
+
+    `infer_batch` takes an (N, 3, S, S) float32 batch scaled to [0, 1] and
+    returns the raw YOLOv8 head output, (N, 4 + classes, anchors), so
+    post-processing and the response schema do not depend on the backend.
+    """
+
+    name = "engine"
+
+    # True when infer_batch returns a buffer that the next call overwrites
+    reuses_output = False
+
+    def __init__(self, model_path):
+        self.model_path = Path(model_path)
+        self.max_batch_size = None  # None = any batch size
+        self.fixed_input_size = None  # Set when the model only accepts one image size
+        self.load_ms = 0.0
+        self.warmup_ms = 0.0
+
+    @abstractmethod
+    def load(self):
+        """Loads the model; called once, off the event loop."""
+
+    @abstractmethod
+    def infer_batch(self, batch):
+        """Raw head output for an (N, 3, S, S) float32 batch."""
+
+    def warmup(self, input_size, batch_sizes=(1,), runs=3):
+        """Runs dummy batches of each size so first requests don't pay for allocations and kernel selection."""
+        t_start = time.perf_counter()
+        for batch_size in batch_sizes:
+            batch = np.zeros((batch_size, 3, input_size, input_size), dtype=np.float32)
+            for _ in range(runs):
+                self.infer_batch(batch)
+        self.warmup_ms = (time.perf_counter() - t_start) * 1000
+
+    def describe(self):
+        return {
+            "engine": self.name,
+            "model_path": str(self.model_path),
+            "max_batch_size": self.max_batch_size,
+            "fixed_input_size": self.fixed_input_size,
+            "load_ms": round(self.load_ms, 1),
+            "warmup_ms": round(self.warmup_ms, 1),
+        }
+
+
+class OnnxEngine(InferenceEngine):
+    """ONNX Runtime on CPU, for both the fp32 and the INT8 quantized export.
+
+    With `io_binding` the input batch is bound in place and the output is
+    written into a preallocated (max batch, 5, anchors) buffer per input
+    size, so steady state inference allocates nothing; the returned array
+    is only valid until the next call with the same input size.
+    """
+
+    def __init__(self, model_path, precision, intra_op_threads=1, inter_op_threads=1,
+                 execution_mode="sequential", io_binding=False, max_batch_size=8):
+        super().__init__(model_path)
+        self.name = f"onnx-{precision}"
+        self.intra_op_threads = intra_op_threads or cpu_quota()
+        self.inter_op_threads = inter_op_threads
+        self.execution_mode = execution_mode
+        self.io_binding = io_binding
+        self.reuses_output = io_binding
+        self.binding_batch_size = max_batch_size
+        self.session = None
+        self.input_name = None
+        self.output_name = None
+        self._binding = None
+        self._output_buffers = {}  # (height, width) -> output buffer
+
+    def load(self):
+        import onnxruntime as ort
+
+        if self.execution_mode not in ("sequential", "parallel"):
+            raise ValueError(f"Unknown ONNX execution mode '{self.execution_mode}'")
+
+        t_start = time.perf_counter()
+        sess_options = ort.SessionOptions()
+        sess_options.intra_op_num_threads = self.intra_op_threads
+        sess_options.inter_op_num_threads = self.inter_op_threads
+        sess_options.execution_mode = (
+            ort.ExecutionMode.ORT_PARALLEL if self.execution_mode == "parallel" else ort.ExecutionMode.ORT_SEQUENTIAL
+        )
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            str(self.model_path),
+            sess_options=sess_options,
+            providers=['CPUExecutionProvider']
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_name = self.session.get_outputs()[0].name
+        # Models exported without a dynamic batch axis only accept batch 1
+        if isinstance(model_input.shape[0], int):
+            self.max_batch_size = 1
+        if isinstance(model_input.shape[2], int):
+            self.fixed_input_size = model_input.shape[2]
+        if self.io_binding:
+            self._binding = self.session.io_binding()
+        self.load_ms = (time.perf_counter() - t_start) * 1000
+
+    def infer_batch(self, batch):
+        if self._binding is None:
+            return self.session.run(None, {self.input_name: batch})[0]
+
+        buffer = self._output_buffers.get(batch.shape[2:])
+        if buffer is None or len(batch) > len(buffer):
+            buffer = self._allocate_output(batch)
+        output = buffer[:len(batch)]
+        self._binding.bind_cpu_input(self.input_name, batch)
+        self._binding.bind_output(self.output_name, "cpu", 0, np.float32, output.shape, output.ctypes.data)
+        self.session.run_with_iobinding(self._binding)
+        return output
+
+    def _allocate_output(self, batch):
+        # Anchor count depends on the input size; one plain run tells us the output shape
+        probe = self.session.run(None, {self.input_name: batch[:1]})[0]
+        rows = self.max_batch_size or self.binding_batch_size
+        buffer = np.empty((max(rows, len(batch)),) + probe.shape[1:], dtype=np.float32)
+        self._output_buffers[batch.shape[2:]] = buffer
+        return buffer
+
+    def describe(self):
+        return {
+            **super().describe(),
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            "execution_mode": self.execution_mode,
+            "io_binding": self.io_binding,
+        }
+
+
+class TorchEngine(InferenceEngine):
+    """Ultralytics YOLOv8 checkpoint run directly through its PyTorch module.
+
+    Calling the module instead of `YOLO.predict` skips Ultralytics' own
+    pre- and post-processing, so the output matches the ONNX export and
+    goes through the same NMS as the other engines.
+    """
+
+    name = "torch"
+
+    def __init__(self, model_path, threads=1):
+        super().__init__(model_path)
+        self.threads = threads or cpu_quota()
+        self.model = None
+        self._torch = None
+
+    def load(self):
+        # Only the torch image ships these
+        import torch
+        from ultralytics import YOLO
+
+        t_start = time.perf_counter()
+        torch.set_num_threads(self.threads)
+        self.model = YOLO(str(self.model_path)).model.float().fuse().eval()
+        self._torch = torch
+        self.load_ms = (time.perf_counter() - t_start) * 1000
+
+    def infer_batch(self, batch):
+        with self._torch.inference_mode():
+            output = self.model(self._torch.from_numpy(batch))
+        # In eval mode the detect head returns (predictions, raw feature maps)
+        if isinstance(output, (list, tuple)):
+            output = output[0]
+        return output.numpy()
+
+    def describe(self):
+        return {**super().describe(), "threads": self.threads}
+
+
+# MODEL_MODE -> (engine, default file in models/production). "standard" is the
+# historical name of the INT8 deployment.
+ENGINE_MODES = {
+    "standard": ("onnx", "int8", "inventory_monitor_quantized.onnx"),
+    "int8": ("onnx", "int8", "inventory_monitor_quantized.onnx"),
+    "fp32": ("onnx", "fp32", "inventory_monitor.onnx"),
+    "torch": ("torch", None, "inventory_monitor.pt"),
+}
+
+
+def create_engine(mode, models_dir, model_path=None, threads=0, inter_op_threads=1,
+                  execution_mode="sequential", io_binding=False, max_batch_size=8):
+    """Builds the (not yet loaded) engine for a MODEL_MODE value; `threads=0` derives them from cpu_quota()."""
+    if mode not in ENGINE_MODES:
+        raise ValueError(f"Unknown MODEL_MODE '{mode}', expected one of {', '.join(ENGINE_MODES)}")
+    backend, precision, filename = ENGINE_MODES[mode]
+    path = Path(model_path) if model_path else Path(models_dir) / filename
+    if backend == "torch":
+        return TorchEngine(path, threads)
+    return OnnxEngine(path, precision, threads, inter_op_threads, execution_mode, io_binding, max_batch_size)
@@ -0,0 +1,219 @@
+import sqlite3
+import threading
+from collections import deque
+from pathlib import Path
+
+BUCKETS = {"minute": 60, "hour": 3600}
+MAX_RETRY_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    camera_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    count INTEGER NOT NULL,
+    status INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events (camera_id, ts);
+CREATE TABLE IF NOT EXISTS cameras (
+    camera_id TEXT PRIMARY KEY,
+    last_ts REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_{name} (
+    camera_id TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    min_count INTEGER NOT NULL,
+    max_count INTEGER NOT NULL,
+    PRIMARY KEY (camera_id, bucket)
+) WITHOUT ROWID;
+"""
+
+ROLLUP_UPSERT = """
+INSERT INTO rollup_{name} (camera_id, bucket, samples, total, min_count, max_count)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (camera_id, bucket) DO UPDATE SET
+    samples = samples + excluded.samples,
+    total = total + excluded.total,
+    min_count = MIN(min_count, excluded.min_count),
+    max_count = MAX(max_count, excluded.max_count)
+"""
+
+
+def connect(path, journal_mode="WAL"):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class HistoryStore:
+    """Append-only SQLite (WAL) store of detection events with per-minute/hour rollups.
+
+    `record` only appends to an in-memory buffer; a background thread flushes
+    it every `flush_interval` seconds in one transaction, updating the raw
+    event table and the rollup tables together. Range queries on a bucket
+    read the rollups by primary key, so they stay fast over months of data.
+    WAL needs shared memory next to the file; on network filesystems (EFS)
+    use the DELETE `journal_mode`.
+
+    A failed flush puts its events back and is retried with exponential
+    backoff; while the database stays unavailable at most `max_pending`
+    events are buffered and newer ones are dropped and counted.
+    """
+
+    def __init__(self, path, flush_interval=1.0, max_points=5000, journal_mode="WAL", max_pending=100000):
+        self.path = str(path)
+        self.journal_mode = journal_mode
+        self.flush_interval = flush_interval
+        self.max_points = max_points
+        self.max_pending = max_pending
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._write_conn = connect(self.path, journal_mode)
+        self._write_conn.executescript(SCHEMA + "".join(ROLLUP_SCHEMA.format(name=name) for name in BUCKETS))
+        self._read_conn = connect(self.path, journal_mode)
+        self._read_lock = threading.Lock()
+
+        self._buffer = deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._write_conn.close()
+        self._read_conn.close()
+
+    def record(self, camera_id, timestamp, count, status):
+        """Queues one event; never touches the database on the caller's thread."""
+        if len(self._buffer) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._buffer.append((camera_id, timestamp, count, status))
+
+    def _run(self):
+        delay = self.flush_interval
+        while not self._stopping:
+            self._wake.wait(delay)
+            self._wake.clear()
+            delay = self.flush_interval if self._try_flush() else min(delay * 2, MAX_RETRY_SECONDS)
+        self._try_flush()
+
+    def _try_flush(self):
+        try:
+            self.flush()
+            return True
+        except sqlite3.Error as e:
+            self.failed_flushes += 1
+            print(f"History flush failed, {len(self._buffer)} events kept for retry: {e}")
+            return False
+
+    def flush(self):
+        events = []
+        while self._buffer:
+            events.append(self._buffer.popleft())
+        if not events:
+            return
+        try:
+            self._write(events)
+        except sqlite3.Error:
+            # Back in front of anything recorded meanwhile, so the retry keeps them in order
+            self._buffer.extendleft(reversed(events))
+            raise
+        self.written += len(events)
+        self.flushes += 1
+
+    def _write(self, events):
+
+        rollups = {name: {} for name in BUCKETS}
+        last_seen = {}
+        for camera_id, ts, count, _ in events:
+            last_seen[camera_id] = max(ts, last_seen.get(camera_id, ts))
+            for name, width in BUCKETS.items():
+                key = (camera_id, int(ts // width) * width)
+                agg = rollups[name].get(key)
+                if agg is None:
+                    rollups[name][key] = [1, count, count, count]
+                else:
+                    agg[0] += 1
+                    agg[1] += count
+                    agg[2] = min(agg[2], count)
+                    agg[3] = max(agg[3], count)
+
+        with self._write_conn:
+            self._write_conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?)", events)
+            for name, buckets in rollups.items():
+                self._write_conn.executemany(
+                    ROLLUP_UPSERT.format(name=name),
+                    [(camera_id, bucket, *agg) for (camera_id, bucket), agg in buckets.items()]
+                )
+            self._write_conn.executemany(
+                "INSERT INTO cameras VALUES (?, ?) ON CONFLICT (camera_id) DO UPDATE SET last_ts = excluded.last_ts",
+                list(last_seen.items())
+            )
+
+    def _read(self, sql, params=()):
+        with self._read_lock:
+            return self._read_conn.execute(sql, params).fetchall()
+
+    def cameras(self):
+        return [row[0] for row in self._read("SELECT camera_id FROM cameras")]
+
+    def recent(self, camera_id, limit):
+        """Latest `limit` events of a camera, oldest first."""
+        rows = self._read(
+            "SELECT ts, count, status FROM events WHERE camera_id = ? ORDER BY ts DESC LIMIT ?",
+            (camera_id, limit)
+        )
+        return rows[::-1]
+
+    def query(self, camera_id, start, end, bucket="minute"):
+        """Events of one camera in [start, end), raw or as min/avg/max per bucket.
+
+        Returns (points, truncated): at most `max_points` points, the oldest
+        first, and whether the range held more; long ranges should use a
+        coarser bucket.
+        """
+        if bucket == "raw":
+            rows = self._read(
+                "SELECT ts, count, status FROM events WHERE camera_id = ? AND ts >= ? AND ts < ? ORDER BY ts LIMIT ?",
+                (camera_id, start, end, self.max_points + 1)
+            )
+            points = [{"ts": ts, "count": count, "status": status} for ts, count, status in rows[:self.max_points]]
+            return points, len(rows) > self.max_points
+
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket '{bucket}', expected raw, {', '.join(BUCKETS)}")
+        width = BUCKETS[bucket]
+        rows = self._read(
+            f"SELECT bucket, samples, total, min_count, max_count FROM rollup_{bucket} "
+            "WHERE camera_id = ? AND bucket >= ? AND bucket < ? ORDER BY bucket LIMIT ?",
+            (camera_id, int(start // width) * width, end, self.max_points + 1)
+        )
+        points = [
+            {"ts": b, "min": mn, "avg": round(total / samples, 2), "max": mx, "samples": samples}
+            for b, samples, total, mn, mx in rows[:self.max_points]
+        ]
+        return points, len(rows) > self.max_points
+
+    def stats(self):
+        return {
+            "pending": len(self._buffer),
+            "written": self.written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+        }
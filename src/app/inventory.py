@@ -0,0 +1,130 @@
+import time
+from datetime import datetime
+
+import numpy as np
+
+STATUSES = ("WAITING", "FULL", "WARNING", "CRITICAL")
+MESSAGES = {
+    "WAITING": "Waiting for first detection...",
+    "FULL": "Optimal Level",
+    "WARNING": "Stock Low",
+    "CRITICAL": "Emergency Restock",
+}
+WAITING, FULL, WARNING, CRITICAL = range(len(STATUSES))
+
+
+def format_clock(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+
+
+class CameraState:
+    """Inventory state of one camera/shelf with a fixed-size history ring buffer.
+
+    History lives in preallocated arrays indexed by a moving head, so an
+    update writes three scalars instead of rebuilding a list.
+    """
+
+    def __init__(self, camera_id, critical_threshold=2, full_capacity=6, history_size=20):
+        self.camera_id = camera_id
+        self.critical_threshold = critical_threshold
+        self.full_capacity = full_capacity
+        self.current_count = 0
+        self.status = WAITING
+        self.last_check = None
+
+        self._timestamps = np.zeros(history_size, dtype=np.float64)
+        self._counts = np.zeros(history_size, dtype=np.int32)
+        self._statuses = np.zeros(history_size, dtype=np.int8)
+        self._head = 0
+        self._size = 0
+
+    def classify(self, count):
+        if count >= self.full_capacity:
+            return FULL
+        if count > self.critical_threshold:
+            return WARNING
+        return CRITICAL
+
+    def update(self, count, timestamp=None):
+        """Records a detection and returns the new status code."""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.current_count = count
+        self.last_check = timestamp
+        self.status = self.classify(count)
+
+        self._timestamps[self._head] = timestamp
+        self._counts[self._head] = count
+        self._statuses[self._head] = self.status
+        self._head = (self._head + 1) % len(self._counts)
+        self._size = min(self._size + 1, len(self._counts))
+        return self.status
+
+    def set_thresholds(self, critical_threshold, full_capacity, timestamp=None):
+        self.critical_threshold = critical_threshold
+        self.full_capacity = full_capacity
+        if self.last_check is not None:
+            self.update(self.current_count, timestamp)
+
+    def history(self):
+        """History entries, newest first."""
+        capacity = len(self._counts)
+        order = (self._head - 1 - np.arange(self._size)) % capacity
+        return [
+            {"timestamp": format_clock(ts), "count": int(count), "status": STATUSES[code]}
+            for ts, count, code in zip(self._timestamps[order], self._counts[order], self._statuses[order])
+        ]
+
+    def latest_entry(self):
+        if self._size == 0:
+            return None
+        i = (self._head - 1) % len(self._counts)
+        return {
+            "timestamp": format_clock(self._timestamps[i]),
+            "count": int(self._counts[i]),
+            "status": STATUSES[self._statuses[i]]
+        }
+
+    def fields(self):
+        """Scalar state without the history, cheap enough to diff on every update."""
+        status = STATUSES[self.status]
+        return {
+            "camera_id": self.camera_id,
+            "current_count": self.current_count,
+            "critical_threshold": self.critical_threshold,
+            "full_capacity": self.full_capacity,
+            "last_check": format_clock(self.last_check) if self.last_check is not None else "Never",
+            "status": status,
+            "message": MESSAGES[status]
+        }
+
+    def to_dict(self):
+        return {**self.fields(), "history": self.history()}
+
+    def summary(self):
+        return {
+            "count": self.current_count,
+            "status": STATUSES[self.status],
+            "last_check": format_clock(self.last_check) if self.last_check is not None else "Never",
+        }
+
+
+class InventoryRegistry:
+    """Per-camera states, created on first use with the default thresholds."""
+
+    def __init__(self, max_cameras=500, history_size=20, critical_threshold=2, full_capacity=6):
+        self.max_cameras = max_cameras
+        self.history_size = history_size
+        self.default_thresholds = (critical_threshold, full_capacity)
+        self.cameras = {}
+
+    def get(self, camera_id):
+        state = self.cameras.get(camera_id)
+        if state is None:
+            if len(self.cameras) >= self.max_cameras:
+                raise ValueError(f"Camera limit reached ({self.max_cameras})")
+            state = CameraState(camera_id, *self.default_thresholds, history_size=self.history_size)
+            self.cameras[camera_id] = state
+        return state
+
+    def summary(self):
+        return {camera_id: state.summary() for camera_id, state in self.cameras.items()}
@@ -1,117 +1,593 @@
+import asyncio
 import io
 import os
+import time
 
 import numpy as np
-import onnxruntime as ort
 import cv2
-from datetime import datetime
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import HTMLResponse, StreamingResponse
-from PIL import Image
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Response
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pathlib import Path
 from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-import requests
+from PIL import Image
+
+from archives import extract_images, is_archive
+from batching import MicroBatcher
+from broadcast import StatusBroadcaster
+from cache import DetectionCache, content_key
+from engines import create_engine
+from history_store import HistoryStore
+from inventory import STATUSES, InventoryRegistry
+from metrics import MetricsMiddleware, MetricsRegistry, server_timing
+from motion import MotionGate, scene_signature
+from postprocessing import CONFIDENCE_THRESHOLD, NMS_THRESHOLD, get_processed_detections as postprocess_detections
+from preprocessing import decode_image, image_size, prepare_frame, prepare_image
+from qos import ResolutionController
+from raw_frames import RawFrameTooLarge, is_raw_frame, read_header
+from shared_state import COUNT, SharedStateLog
+from streams import VideoStream, parse_streams
+from tracking import BoxTracker
+from tiling import merge_tiles, prepare_tiles
+from workers import BoundedExecutor, OverloadedError
 
 DUCKDNS_TOKEN = os.getenv("DUCKDNS_TOKEN")
 DUCKDNS_DOMAIN = os.getenv("DUCKDNS_DOMAIN")
 
 # --- Configuration & Global State ---
+# Inference backend: standard/int8 (ONNX INT8), fp32 (ONNX fp32) or torch (Ultralytics checkpoint)
+MODEL_MODE = os.getenv("MODEL_MODE", "standard")
+MODEL_PATH = os.getenv("MODEL_PATH")  # Overrides the mode's default file in models/production
+
+# Inference threads: 0 = derive from the container's CPU quota (cgroup), not the host's core count
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))
+ORT_INTER_OP_THREADS = int(os.getenv("ORT_INTER_OP_THREADS", "1"))
+ORT_EXECUTION_MODE = os.getenv("ORT_EXECUTION_MODE", "sequential")  # sequential | parallel
+ORT_IO_BINDING = os.getenv("ORT_IO_BINDING", "1") == "1"
+WARMUP_RUNS = int(os.getenv("WARMUP_RUNS", "3"))
+
 INPUT_SIZE = 320
-CONFIDENCE_THRESHOLD = 0.30
-NMS_THRESHOLD = 0.45
-
-inventory_state = {
-    "current_count": 0,
-    "critical_threshold": 2,
-    "full_capacity": 6,
-    "last_check": "Never",
-    "status": "WAITING",
-    "message": "Waiting for first detection...",
-    "history": []
-}
+
+# Load-adaptive quality: to keep p95 inference latency under LATENCY_TARGET_MS the input size steps
+# down INPUT_SIZES, then each camera is inferred less often (uploads at most once per
+# QOS_CAMERA_INTERVAL_SECONDS, doubled per throttle level). Needs a model exported with dynamic
+# height/width; 0 = always INPUT_SIZE
+INPUT_SIZES = [int(size) for size in os.getenv("INPUT_SIZES", "224,256,320").split(",") if size.strip()]
+LATENCY_TARGET_MS = float(os.getenv("LATENCY_TARGET_MS", "0"))
+QOS_INTERVAL_SECONDS = float(os.getenv("QOS_INTERVAL_SECONDS", "2"))
+QOS_MAX_THROTTLE = int(os.getenv("QOS_MAX_THROTTLE", "2"))
+QOS_CAMERA_INTERVAL_SECONDS = float(os.getenv("QOS_CAMERA_INTERVAL_SECONDS", "1"))
+qos = ResolutionController(INPUT_SIZES, INPUT_SIZE, LATENCY_TARGET_MS, QOS_INTERVAL_SECONDS, QOS_MAX_THROTTLE)
+
+# Micro-batching: concurrent /predict calls are grouped into one model run
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+# Backpressure: blocking work runs on a small pool, overflow is answered with 503 + Retry-After
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", "2"))
+MAX_PENDING_REQUESTS = int(os.getenv("MAX_PENDING_REQUESTS", "16"))
+RETRY_AFTER_SECONDS = 1
+
+# /predict-batch: images per request, uploaded as files or inside one zip/tar archive
+MAX_BATCH_IMAGES = int(os.getenv("MAX_BATCH_IMAGES", "64"))
+# Total image bytes held in memory per batch request, uploads and extracted archive members alike
+MAX_BATCH_BYTES = int(float(os.getenv("MAX_BATCH_MB", "256")) * 1024 * 1024)
+
+# /verify-image: "json" returns boxes for the inspector to draw, "jpeg"/"webp" an annotated preview
+VERIFY_OUTPUTS = ("json", "jpeg", "webp")
+MAX_PREVIEW_DIM = 8192
+
+# Per-camera inventory state; cameras that don't send an ID share the default one
+DEFAULT_CAMERA_ID = "default"
+MAX_CAMERAS = int(os.getenv("MAX_CAMERAS", "500"))
+HISTORY_SIZE = 20
+
+inventory = InventoryRegistry(max_cameras=MAX_CAMERAS, history_size=HISTORY_SIZE)
+inventory.get(DEFAULT_CAMERA_ID)
+
+# Dashboards subscribe to /status/stream instead of polling /status
+MAX_STREAM_SUBSCRIBERS = int(os.getenv("MAX_STREAM_SUBSCRIBERS", "100"))
+broadcaster = StatusBroadcaster(max_subscribers=MAX_STREAM_SUBSCRIBERS)
+
+# Detection cache for byte-identical frames (looping simulators, static night-time shelves)
+DETECTION_CACHE_MB = float(os.getenv("DETECTION_CACHE_MB", "16"))
+DETECTION_CACHE_TTL_SECONDS = float(os.getenv("DETECTION_CACHE_TTL_SECONDS", "300"))
+detection_cache = DetectionCache(int(DETECTION_CACHE_MB * 1024 * 1024), DETECTION_CACHE_TTL_SECONDS)
+
+# Motion gating: static scenes reuse the camera's last detections for up to MOTION_MAX_SKIP_SECONDS.
+# Off by default, since a reused count can miss a change; ~8 (worst 1/64 block of the frame, 0-255)
+# still catches a single package taken off a shelf
+MOTION_THRESHOLD = float(os.getenv("MOTION_THRESHOLD", "0"))
+MOTION_MAX_SKIP_SECONDS = float(os.getenv("MOTION_MAX_SKIP_SECONDS", "30"))
+# Two entries per camera at most: single-shot and tiled frames are gated separately
+motion_gate = MotionGate(MOTION_THRESHOLD, MOTION_MAX_SKIP_SECONDS, 2 * MAX_CAMERAS)
+
+# Sliced inference for high-resolution shelf photos: the image is decoded at up to TILE_MAX_DIM
+# and split into overlapping model-sized tiles. On for the cameras listed here, or per request
+TILED_CAMERAS = {camera.strip() for camera in os.getenv("TILED_CAMERAS", "").split(",") if camera.strip()}
+TILE_MAX_DIM = int(os.getenv("TILE_MAX_DIM", "960"))
+TILE_OVERLAP = int(os.getenv("TILE_OVERLAP", "64"))
+
+# Continuous ingest: the server pulls frames itself from RTSP/MJPEG URLs or video files, given as
+# comma-separated camera=source pairs, and infers the newest frame STREAM_INFERENCE_FPS times a
+# second. Every worker process pulls every stream, so run stream ingest with a single worker
+STREAMS = parse_streams(os.getenv("STREAMS", ""))
+STREAM_INFERENCE_FPS = float(os.getenv("STREAM_INFERENCE_FPS", "1"))
+STREAM_LOOP_FILES = os.getenv("STREAM_LOOP_FILES", "1") == "1"
+# Detect-then-track for streams: the model runs every TRACK_DETECT_EVERY sampled frames, or sooner
+# when optical-flow tracking loses confidence; boxes are tracked in between (1 = detect every frame)
+TRACK_DETECT_EVERY = int(os.getenv("TRACK_DETECT_EVERY", "1"))
+TRACK_MIN_CONFIDENCE = float(os.getenv("TRACK_MIN_CONFIDENCE", "0.6"))
+
+# Persistent detection history (SQLite); an empty path disables it. The default is inside the
+# container, so deployments point it at a persistent volume (terraform/storage.tf). WAL journal
+# by default; DELETE on network filesystems such as EFS
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", str(Path(__file__).resolve().parent / "data" / "history.db"))
+HISTORY_JOURNAL_MODE = os.getenv("HISTORY_JOURNAL_MODE", "WAL")
+HISTORY_FLUSH_SECONDS = float(os.getenv("HISTORY_FLUSH_SECONDS", "1"))
+HISTORY_DEFAULT_RANGE_SECONDS = 24 * 3600
+HISTORY_MAX_POINTS = 5000  # Per /history response
+
+# Shared state for `uvicorn --workers N`: all workers replay one SQLite log of count and
+# threshold changes, so /status is the same whichever worker answers (empty = single process)
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "")
+SHARED_STATE_SYNC_MS = float(os.getenv("SHARED_STATE_SYNC_MS", "250"))
+
+# Prometheus metrics served on /metrics
+metrics = MetricsRegistry()
+stage_duration = metrics.histogram(
+    "stage_duration_seconds", "Time spent per processing stage", ["stage"]
+)
+http_requests = metrics.counter("http_requests_total", "HTTP requests served", ["method", "path", "status"])
+http_duration = metrics.histogram("http_request_duration_seconds", "HTTP request handling time", ["path"])
 
 model_assets = {}
+services = {}
+# Startup progress reported by /health/ready: starting -> ready | failed
+startup = {"state": "starting", "error": None, "phases_ms": {}}
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Optimized model loading for single-core Fargate environment."""
+def restore_history(store):
+    """Refills the per-camera activity logs from the persistent store after a restart."""
+    for camera_id in store.cameras():
+        try:
+            state = inventory.get(camera_id)
+        except ValueError:
+            break
+        for ts, count, _ in store.recent(camera_id, HISTORY_SIZE):
+            state.update(count, ts)
 
+
+def apply_shared_change(camera_id, kind, timestamp, count, critical_threshold, full_capacity):
+    try:
+        state = inventory.get(camera_id)
+    except ValueError:
+        return
+    before = state.fields()
+    if kind == COUNT:
+        state.update(count, timestamp)
+    else:
+        state.set_thresholds(critical_threshold, full_capacity, timestamp)
+    publish_change(state, before)
+
+
+async def sync_shared_state():
+    """Applies the changes any worker logged since the last sync, in log order."""
+    shared = services.get("shared_state")
+    if shared is not None:
+        # One reader at a time, so batches are applied in the order the log handed them out
+        async with services["shared_sync_lock"]:
+            for _, *change in await shared.run(shared.read_new):
+                apply_shared_change(*change)
+
+
+async def sync_shared_state_forever():
+    # Feeds /status/stream subscribers of this worker with changes made by the others
+    while True:
+        await asyncio.sleep(SHARED_STATE_SYNC_MS / 1000)
+        try:
+            await sync_shared_state()
+        except Exception as e:
+            print(f"Shared state sync failed: {e}")
+
+
+def restore_shared_state(thresholds, rows):
+    """Rebuilds this worker's registry from the shared log's thresholds and recent entries."""
+    for camera_id, critical_threshold, full_capacity in thresholds:
+        try:
+            inventory.get(camera_id).set_thresholds(critical_threshold, full_capacity)
+        except ValueError:
+            break
+    for _, *change in rows:
+        apply_shared_change(*change)
+
+
+def update_duckdns():
+    """Points the DuckDNS name at this task; runs in the background, off the startup path."""
+    if not (DUCKDNS_TOKEN and DUCKDNS_DOMAIN):
+        print("DuckDNS not configured, skipping update")
+        return
+    import requests  # Only needed here, so it stays off the import path of the server
+
+    t_start = time.perf_counter()
     try:
         url = f"https://www.duckdns.org/update?domains={DUCKDNS_DOMAIN}&token={DUCKDNS_TOKEN}"
         requests.get(url, timeout=10)
-        print(f"DuckDNS updated for domain: {DUCKDNS_DOMAIN}")
+        print(f"DuckDNS updated for domain: {DUCKDNS_DOMAIN} ({(time.perf_counter() - t_start) * 1000:.0f} ms)")
     except Exception as e:
         print(f"DuckDNS update failed: {e}")
 
-    current_dir = Path(__file__).resolve().parent
-    model_path = current_dir / "models" / "production" / "inventory_monitor_quantized.onnx"
 
-    if model_path.exists():
+def startup_phase(name, fn, *args):
+    """Runs one startup step and records its duration for the log and /health/ready."""
+    result, elapsed_ms = timed(fn, *args)
+    startup["phases_ms"][name] = round(elapsed_ms, 1)
+    return result
+
+
+def warm_up(engine, max_batch_size):
+    # Every size QoS may switch to, so a degrade doesn't stall on fresh allocations
+    for size in qos.sizes if qos.enabled else [INPUT_SIZE]:
+        engine.warmup(size, sorted({1, max_batch_size}), WARMUP_RUNS)
+    # Also pull the JPEG decoder and resize kernels in before the first upload does
+    buffer = io.BytesIO()
+    Image.new("RGB", (INPUT_SIZE * 2, INPUT_SIZE * 2)).save(buffer, format="JPEG")
+    prepare_image(buffer.getvalue(), INPUT_SIZE)
+
+
+async def load_model(t_start):
+    """Loads and warms the engine off the event loop, then publishes it; flips readiness."""
+    try:
+        models_dir = Path(__file__).resolve().parent / "models" / "production"
+        engine = create_engine(
+            MODEL_MODE, models_dir, MODEL_PATH, INFERENCE_THREADS, ORT_INTER_OP_THREADS,
+            ORT_EXECUTION_MODE, ORT_IO_BINDING, BATCH_MAX_SIZE
+        )
+        if not engine.model_path.exists():
+            raise FileNotFoundError(f"Model file not found: {engine.model_path}")
+
+        await asyncio.to_thread(startup_phase, "model_load", engine.load)
+        if qos.enabled and engine.fixed_input_size is not None:
+            qos.disable(f"model only accepts {engine.fixed_input_size}px input; export it with dynamic=True")
+        batcher = MicroBatcher(engine, INPUT_SIZE, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, MAX_PENDING_REQUESTS)
+        # Warm up before the model is published, so no request pays for the first runs
+        await asyncio.to_thread(startup_phase, "warmup", warm_up, engine, batcher.max_batch_size)
+
+        batcher.start()
+        model_assets["cpu_pool"] = BoundedExecutor(CPU_WORKERS, MAX_PENDING_REQUESTS)
+        model_assets["batcher"] = batcher
+        model_assets["engine"] = engine
+    except Exception as e:
+        startup["state"] = "failed"
+        startup["error"] = str(e)
+        print(f"Error loading model: {e}")
+        return
+
+    startup["state"] = "ready"
+    startup["phases_ms"]["ready"] = round((time.perf_counter() - t_start) * 1000, 1)
+    print(f"Model loaded successfully: {engine.model_path} "
+          f"(engine: {engine.name}, max batch: {batcher.max_batch_size})")
+    print("Startup: " + " | ".join(f"{name} {ms:.0f} ms" for name, ms in startup["phases_ms"].items()))
+    # Streams need the model, so they start once it is published
+    start_streams()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts serving right away; DNS registration and model loading continue in the background."""
+    t_start = time.perf_counter()
+
+    services["dns"] = asyncio.create_task(asyncio.to_thread(update_duckdns))
+
+    if SHARED_STATE_PATH:
         try:
-            sess_options = ort.SessionOptions()
-            sess_options.intra_op_num_threads = 1
-            sess_options.inter_op_num_threads = 1
-            sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
-            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-
-            session = ort.InferenceSession(
-                str(model_path),
-                sess_options=sess_options,
-                providers=['CPUExecutionProvider']
+            shared = await asyncio.to_thread(
+                startup_phase, "shared_state", SharedStateLog, SHARED_STATE_PATH, MAX_CAMERAS * HISTORY_SIZE
             )
+            snapshot = await shared.run(startup_phase, "shared_state_snapshot", shared.snapshot, HISTORY_SIZE)
+            startup_phase("shared_state_restore", restore_shared_state, *snapshot)
+            services["shared_state"] = shared
+            services["shared_sync_lock"] = asyncio.Lock()
+            services["shared_sync"] = asyncio.create_task(sync_shared_state_forever())
+            print(f"Shared state ready: {SHARED_STATE_PATH} (pid {os.getpid()})")
+        except Exception as e:
+            print(f"Shared state unavailable: {e}")
 
-            model_assets["session"] = session
-            model_assets["input_name"] = session.get_inputs()[0].name
-            print(f"Model loaded successfully: {model_path}")
+    if HISTORY_DB_PATH:
+        try:
+            store = startup_phase(
+                "history", HistoryStore, HISTORY_DB_PATH, HISTORY_FLUSH_SECONDS, HISTORY_MAX_POINTS, HISTORY_JOURNAL_MODE
+            )
+            # With shared state the log already restored the recent entries
+            if "shared_state" not in services:
+                startup_phase("history_restore", restore_history, store)
+            store.start()
+            services["history"] = store
+            print(f"History store ready: {HISTORY_DB_PATH}")
         except Exception as e:
-            print(f"Error loading model: {e}")
+            print(f"History store unavailable: {e}")
+
+    services["model_loader"] = asyncio.create_task(load_model(t_start))
+    print(f"Accepting connections after {(time.perf_counter() - t_start) * 1000:.0f} ms, "
+          "model loading in the background")
     yield
+    for name in ("model_loader", "dns"):
+        services.pop(name).cancel()
+    await stop_streams()
+    if "batcher" in model_assets:
+        await model_assets["batcher"].stop()
+        model_assets["cpu_pool"].shutdown()
     model_assets.clear()
+    if "history" in services:
+        services.pop("history").stop()
+    if "shared_state" in services:
+        services.pop("shared_sync").cancel()
+        await asyncio.to_thread(services.pop("shared_state").close)
 
 
 app = FastAPI(lifespan=lifespan)
 
 
+def route_paths():
+    if "route_paths" not in services:
+        services["route_paths"] = frozenset(route.path for route in app.routes)
+    return services["route_paths"]
+
+
+app.add_middleware(
+    MetricsMiddleware, requests_total=http_requests, request_duration=http_duration, known_paths=route_paths
+)
+
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "error": str(exc)},
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
 # --- Internal Logic ---
 
-def get_processed_detections(predictions, orig_size):
-    """Core logic to filter boxes using NMS."""
-    orig_h, orig_w = orig_size
-    scale_x, scale_y = orig_w / INPUT_SIZE, orig_h / INPUT_SIZE
-
-    boxes, confidences = [], []
-    for pred in predictions:
-        conf = float(pred[4])
-        if conf >= CONFIDENCE_THRESHOLD:
-            w, h = int(pred[2] * scale_x), int(pred[3] * scale_y)
-            x, y = int((pred[0] * scale_x) - w / 2), int((pred[1] * scale_y) - h / 2)
-            boxes.append([x, y, w, h])
-            confidences.append(conf)
-
-    indices = cv2.dnn.NMSBoxes(boxes, confidences, CONFIDENCE_THRESHOLD, NMS_THRESHOLD)
-    return indices, boxes, confidences
-
-
-def update_inventory_status(count):
-    """Updates global state and history buffer."""
-    inventory_state["current_count"] = count
-    inventory_state["last_check"] = datetime.now().strftime("%H:%M:%S")
-
-    if count >= inventory_state["full_capacity"]:
-        inventory_state["status"] = "FULL"
-        inventory_state["message"] = "Optimal Level"
-    elif count > inventory_state["critical_threshold"]:
-        inventory_state["status"] = "WARNING"
-        inventory_state["message"] = "Stock Low"
+def get_processed_detections(output, orig_size, input_size=INPUT_SIZE):
+    """Core logic to filter boxes using NMS on the raw (5, N) or (B, 5, N) output."""
+    return postprocess_detections(output, orig_size, input_size, CONFIDENCE_THRESHOLD, NMS_THRESHOLD)
+
+
+def timed(fn, *args):
+    """Runs fn and returns (result, elapsed ms)."""
+    t_start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - t_start) * 1000
+
+
+def record_stages(timings):
+    for stage, ms in timings.items():
+        stage_duration.observe(ms / 1000, stage)
+
+
+async def infer_views(views):
+    """Runs several model-sized images through the batcher, at most one batch at a time.
+
+    Stage times are the slowest view of each batch, summed over batches.
+    """
+    batcher = model_assets["batcher"]
+    outputs, timings = [], {}
+    for start in range(0, len(views), batcher.max_batch_size):
+        results = await asyncio.gather(*(batcher.infer(view) for view in views[start:start + batcher.max_batch_size]))
+        outputs.extend(output for output, _ in results)
+        for stage in results[0][1]:
+            timings[stage] = timings.get(stage, 0.0) + max(view_timings[stage] for _, view_timings in results)
+    return outputs, timings
+
+
+def use_tiling(camera_id, tiled=None):
+    """Per-request choice if given, else whether the camera is listed in TILED_CAMERAS."""
+    return tiled if tiled is not None else camera_id in TILED_CAMERAS
+
+
+def merge_tile_detections(outputs, tiled_image):
+    return merge_tiles(outputs, tiled_image, INPUT_SIZE, CONFIDENCE_THRESHOLD, NMS_THRESHOLD)
+
+
+async def run_detection(contents, camera_id=None, tiled=False):
+    """Boxes and scores for an upload, served from the detection cache when possible.
+
+    With a `camera_id`, frames that barely differ from that camera's last
+    inferred frame reuse its detections instead of running the model.
+    `tiled` runs sliced inference (see tiling) instead of one downscaled pass.
+    Returns (boxes, scores, timings_ms, reused) where reused is "cache",
+    "motion", "qos" (camera throttled under load) or None.
+    """
+    t_start = time.perf_counter()
+    pool = model_assets["cpu_pool"]
+    key, hash_ms = await pool.run(timed, content_key, contents)
+    timings = {"hash": hash_ms}
+    if tiled:
+        key += b":tiled"
+
+    cached = detection_cache.get(key) if detection_cache.max_bytes > 0 else None
+    if cached is not None:
+        record_stages(timings)
+        boxes, scores = cached
+        return boxes, scores, timings, "cache"
+
+    if camera_id is not None and not tiled:
+        throttled = qos.throttled_result(camera_id, QOS_CAMERA_INTERVAL_SECONDS)
+        if throttled is not None:
+            boxes, scores = throttled
+            return boxes, scores, timings, "qos"
+
+    # Tiles keep the full size: sliced inference is an explicit per-camera choice
+    if tiled:
+        prepared = await pool.run(prepare_tiles, contents, INPUT_SIZE, TILE_MAX_DIM, TILE_OVERLAP)
     else:
-        inventory_state["status"] = "CRITICAL"
-        inventory_state["message"] = "Emergency Restock"
+        prepared = await pool.run(prepare_image, contents, qos.input_size())
+    timings.update(prepared.timings)
+    record_stages(timings)
+
+    boxes, scores, reused = await detect_prepared(prepared, camera_id, timings, tiled)
+    if reused is None:
+        qos.observe((time.perf_counter() - t_start) * 1000)
+        if detection_cache.max_bytes > 0:
+            detection_cache.put(key, boxes, scores)
+    return boxes, scores, timings, reused
+
+
+async def detect_prepared(prepared, camera_id, timings, tiled=False):
+    """Motion gating, inference and post-processing for decoded pixels (or a tile set).
+
+    Adds the stage times to `timings`; returns (boxes, scores, reused).
+    """
+    pool = model_assets["cpu_pool"]
+    pixels = prepared.views[0] if tiled else prepared.pixels
+    gated = camera_id is not None and MOTION_THRESHOLD > 0
+    if gated:
+        # Tiled and single-shot detections of the same camera are not interchangeable
+        gate_key = f"{camera_id}:tiled" if tiled else camera_id
+        signature = scene_signature(pixels)
+        previous = motion_gate.lookup(gate_key, signature)
+        if previous is not None:
+            boxes, scores = previous
+            return boxes, scores, "motion"
 
-    log_entry = {"timestamp": inventory_state["last_check"], "count": count, "status": inventory_state["status"]}
-    inventory_state["history"].insert(0, log_entry)
-    inventory_state["history"] = inventory_state["history"][:20]
+    try:
+        if tiled:
+            outputs, batch_timings = await infer_views(prepared.views)
+        else:
+            output, batch_timings = await model_assets["batcher"].infer(pixels)
+    except OverloadedError:
+        qos.observe_overload()
+        raise
+    if tiled:
+        (boxes, scores), postprocess_ms = await pool.run(timed, merge_tile_detections, outputs, prepared)
+    else:
+        (boxes, scores), postprocess_ms = await pool.run(
+            timed, get_processed_detections, output, prepared.orig_size, pixels.shape[0]
+        )
+    batch_timings["postprocess"] = postprocess_ms
+    record_stages(batch_timings)
+    for stage, ms in batch_timings.items():
+        timings[stage] = timings.get(stage, 0.0) + ms
+
+    if gated:
+        motion_gate.store(gate_key, signature, boxes, scores, batch_timings["inference"] + postprocess_ms)
+    if camera_id is not None and not tiled:
+        qos.remember(camera_id, boxes, scores)
+    return boxes, scores, None
+
+
+async def process_stream_frame(camera_id, frame):
+    """Inference on one sampled video frame; feeds the same inventory path as /predict.
+
+    With tracking enabled, most frames only move the camera's tracks and the
+    count is the number of tracked packages.
+    """
+    t_start = time.perf_counter()
+    pool = model_assets["cpu_pool"]
+    prepared = await pool.run(prepare_frame, frame, qos.input_size())
+    record_stages(prepared.timings)
+    tracker = services.get("trackers", {}).get(camera_id)
+
+    if tracker is not None and not tracker.needs_detection(prepared.pixels.shape[:2]):
+        _, track_ms = await pool.run(timed, tracker.track, prepared.pixels)
+        record_stages({"track": track_ms})
+        count = len(tracker)
+    else:
+        boxes, scores, reused = await detect_prepared(prepared, camera_id, dict(prepared.timings))
+        if reused is None:
+            qos.observe((time.perf_counter() - t_start) * 1000)
+        count = len(boxes)
+        if tracker is not None:
+            await pool.run(tracker.update, prepared.pixels, boxes, scores, prepared.orig_size)
+            count = len(tracker)
+    await update_inventory_status(count, camera_id)
+
+
+def start_streams():
+    for camera_id, source in STREAMS.items():
+        if TRACK_DETECT_EVERY > 1:
+            services.setdefault("trackers", {})[camera_id] = BoxTracker(TRACK_DETECT_EVERY, TRACK_MIN_CONFIDENCE)
+        stream = VideoStream(camera_id, source, STREAM_INFERENCE_FPS, STREAM_LOOP_FILES)
+        services.setdefault("streams", {})[camera_id] = (stream, asyncio.create_task(
+            stream.run(process_stream_frame, qos.rate_divisor)
+        ))
+        print(f"Stream ingest started: {camera_id} at {STREAM_INFERENCE_FPS:g} fps"
+              + (f", detecting every {TRACK_DETECT_EVERY} frames" if TRACK_DETECT_EVERY > 1 else ""))
+
+
+def stream_stats():
+    trackers = services.get("trackers", {})
+    return [
+        {**stream.stats(), **({"tracker": trackers[camera_id].stats()} if camera_id in trackers else {})}
+        for camera_id, (stream, _) in services.get("streams", {}).items()
+    ]
+
+
+async def stop_streams():
+    for stream, task in services.pop("streams", {}).values():
+        task.cancel()
+        await asyncio.to_thread(stream.stop)
+    services.pop("trackers", None)
+
+
+def annotate_and_encode(contents, boxes, image_format="jpeg", max_dim=0, quality=85):
+    """Draws the kept boxes on the image, optionally downscaled to `max_dim`, and encodes it.
+
+    Downscaled previews decode JPEGs at reduced resolution (see decode_image),
+    so a small preview of a 12 MP photo never materialises the full image.
+    """
+    pixels, (orig_h, orig_w) = decode_image(contents, max_dim or MAX_PREVIEW_DIM)
+    scale = min(1.0, max_dim / max(orig_h, orig_w)) if max_dim else 1.0
+    size = (max(1, round(orig_w * scale)), max(1, round(orig_h * scale)))
+    if pixels.shape[1::-1] != size:
+        pixels = cv2.resize(pixels, size, interpolation=cv2.INTER_AREA)
+    img = cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR)
+
+    thickness = max(1, round(3 * max(size) / 1280)) if max_dim else 3
+    for x, y, w, h in (boxes * scale).round().astype(int).tolist():
+        cv2.rectangle(img, (x, y), (x + w, y + h), (138, 43, 226), thickness)
+
+    if image_format == "webp":
+        _, buffer = cv2.imencode(".webp", img, [int(cv2.IMWRITE_WEBP_QUALITY), quality])
+    else:
+        _, buffer = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return buffer.tobytes()
+
+
+def publish_change(state, before):
+    """Pushes the fields that changed, plus the new log entry, to stream subscribers."""
+    delta = {key: value for key, value in state.fields().items() if before.get(key) != value}
+    entry = state.latest_entry()
+    if entry is not None:
+        delta["entry"] = entry
+    delta["camera_id"] = state.camera_id
+    broadcaster.publish(state.camera_id, delta)
+
+
+async def update_inventory_status(count, camera_id=DEFAULT_CAMERA_ID):
+    """Updates the camera state and its history ring buffer."""
+    state = inventory.get(camera_id)
+    if "shared_state" in services:
+        # Logged first and applied in log order, like the other workers will
+        shared = services["shared_state"]
+        timestamp = time.time()
+        await shared.run(shared.append_count, camera_id, count, timestamp)
+        await sync_shared_state()
+        status = state.classify(count)
+    else:
+        before = state.fields()
+        status = state.update(count)
+        timestamp = state.last_check
+        publish_change(state, before)
+    if "history" in services:
+        services["history"].record(camera_id, timestamp, count, status)
+    return status
 
 
 # --- API Endpoints ---
@@ -126,64 +602,358 @@ async def inspector_page():
     return (Path(__file__).parent / "inspector.html").read_text()
 
 
+def admit_cameras(camera_ids):
+    """Creates the cameras a request updates, or answers 400 before any work if they'd exceed MAX_CAMERAS.
+
+    Checked up front so unknown cameras never reach the model, the motion gate or QoS state.
+    """
+    new = {camera_id for camera_id in camera_ids if camera_id and camera_id not in inventory.cameras}
+    if len(inventory.cameras) + len(new) > inventory.max_cameras:
+        raise HTTPException(status_code=400, detail=f"Camera limit reached ({inventory.max_cameras})")
+    for camera_id in new:
+        inventory.get(camera_id)
+
+
+def check_raw_frame(contents):
+    """Answers 413/400 for an oversized or malformed raw frame header, before any decompression."""
+    if not is_raw_frame(contents):
+        return
+    try:
+        read_header(contents)
+    except RawFrameTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def find_camera(camera_id):
+    state = inventory.cameras.get(camera_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Unknown camera: {camera_id}")
+    return state
+
+
+@app.get("/health/live")
+async def health_live():
+    """The process is up and serving; says nothing about the model."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """200 once the model is loaded and warm, so the load balancer only routes traffic then."""
+    body = {"status": startup["state"], "phases_ms": startup["phases_ms"]}
+    if startup["error"]:
+        body["error"] = startup["error"]
+    return JSONResponse(body, status_code=200 if startup["state"] == "ready" else 503)
+
+
 @app.get("/status")
-async def get_status():
-    return inventory_state
+async def get_status(camera_id: str = DEFAULT_CAMERA_ID):
+    await sync_shared_state()
+    return {**find_camera(camera_id).to_dict(), "qos": qos.summary()}
+
+
+@app.get("/status/summary")
+async def get_status_summary():
+    """Compact count/status of every known camera."""
+    await sync_shared_state()
+    return {"cameras": inventory.summary()}
+
+
+@app.get("/status/stream")
+async def stream_status(camera_id: str = DEFAULT_CAMERA_ID):
+    """Server-sent events: a snapshot on connect, then a delta on every change."""
+    await sync_shared_state()
+    state = find_camera(camera_id)
+    subscription = broadcaster.subscribe(camera_id)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many stream subscribers",
+                            headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+    return StreamingResponse(
+        broadcaster.stream(subscription, state.to_dict),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also frees the slot if the client left before the stream started
+        background=BackgroundTask(subscription.release)
+    )
+
+
+@app.get("/history")
+async def get_history(camera_id: str = DEFAULT_CAMERA_ID, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None, bucket: str = "minute"):
+    """Detection history of one camera: raw events or min/avg/max per minute/hour.
+
+    `truncated` is true when the range holds more points than one response
+    returns; the points then end early and a coarser bucket covers it all.
+    """
+    if "history" not in services:
+        raise HTTPException(status_code=503, detail="History store disabled")
+
+    end_ts = end.timestamp() if end else datetime.now().timestamp()
+    start_ts = start.timestamp() if start else end_ts - HISTORY_DEFAULT_RANGE_SECONDS
+    try:
+        points, truncated = await run_in_threadpool(services["history"].query, camera_id, start_ts, end_ts, bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for point in points:
+        point["time"] = datetime.fromtimestamp(point.pop("ts")).isoformat()
+        if "status" in point:
+            point["status"] = STATUSES[point["status"]]
+    return {"camera_id": camera_id, "bucket": bucket, "points": points, "truncated": truncated}
+
+
+@app.get("/queue")
+async def get_queue_stats():
+    """Queue depth and wait times of the worker pool and the inference batcher."""
+    if "batcher" not in model_assets:
+        raise HTTPException(status_code=503)
+    return {"workers": model_assets["cpu_pool"].stats(), "inference": model_assets["batcher"].stats()}
+
+
+@app.get("/engine")
+async def get_engine():
+    """Which backend and model file this server runs, for comparing benchmark results."""
+    if "engine" not in model_assets:
+        raise HTTPException(status_code=503)
+    return model_assets["engine"].describe()
+
+
+@app.get("/streams")
+async def get_streams():
+    """Per-stream ingest state, frame counters and decode/inference lag."""
+    return {"streams": stream_stats()}
+
+
+@app.get("/cache")
+async def get_cache_stats():
+    """Hit/miss/eviction counters of the detection cache."""
+    return detection_cache.stats()
+
+
+@app.get("/motion")
+async def get_motion_stats():
+    """Skip rate and estimated CPU saved by motion gating."""
+    return motion_gate.stats()
+
+
+def collect_runtime_metrics():
+    """Gauges read at scrape time from the live components."""
+    if "batcher" in model_assets:
+        batcher, pool = model_assets["batcher"].stats(), model_assets["cpu_pool"].stats()
+        yield "queue_depth", "Requests waiting per queue", ("queue",), [
+            (("inference",), batcher["queue_depth"]), (("workers",), pool["queue_depth"])
+        ]
+        yield "queue_rejected", "Requests rejected because a queue was full", ("queue",), [
+            (("inference",), batcher["rejected"]), (("workers",), pool["rejected"])
+        ]
+        yield "batch_size_avg", "Average inference batch size", (), [((), batcher["avg_batch_size"])]
+    cache = detection_cache.stats()
+    yield "cache_events", "Detection cache lookups and evictions", ("event",), [
+        ((event,), cache[event]) for event in ("hits", "misses", "evictions", "expirations")
+    ]
+    motion = motion_gate.stats()
+    yield "motion_frames", "Frames checked and skipped by motion gating", ("result",), [
+        (("checked",), motion["checked"]), (("skipped",), motion["skipped"])
+    ]
+    yield "stream_subscribers", "Open /status/stream connections", (), [((), broadcaster.subscribers)]
+    ingest = stream_stats()
+    if ingest:
+        yield "ingest_frames", "Video stream frames per outcome", ("camera", "event"), [
+            ((stats["camera_id"], event), stats[f"frames_{event}"])
+            for stats in ingest for event in ("decoded", "dropped", "inferred", "skipped")
+        ]
+        yield "ingest_lag_seconds", "Average video stream decode time and lag", ("camera", "stage"), [
+            ((stats["camera_id"], stage), stats[f"{stage}_ms"]["avg"] / 1000)
+            for stats in ingest for stage in ("decode", "frame_age", "result_lag")
+        ]
+        tracked = [stats for stats in ingest if "tracker" in stats]
+        if tracked:
+            yield "tracker_frames", "Stream frames sent to the model or only tracked", ("camera", "mode"), [
+                ((stats["camera_id"], mode), stats["tracker"][f"{mode}_frames"])
+                for stats in tracked for mode in ("detected", "tracked")
+            ]
+    if "history" in services:
+        history = services["history"].stats()
+        yield "history_events", "History store events per outcome", ("event",), [
+            ((event,), history[event]) for event in ("pending", "written", "dropped")
+        ]
+        yield "history_failed_flushes", "History flushes that failed and were retried", (), [
+            ((), history["failed_flushes"])
+        ]
+    quality = qos.summary()
+    yield "input_size", "Current model input size in pixels", (), [((), quality["input_size"])]
+    yield "qos_throttle_level", "Per-camera inference rate is divided by 2^level", (), [
+        ((), quality["throttle_level"])
+    ]
+    yield "qos_events", "Input size and camera rate changes made under load", ("event",), [
+        ((event,), count) for event, count in quality["events"].items()
+    ]
+    yield "camera_count", "Packages currently detected per camera", ("camera",), [
+        ((camera_id,), state.current_count) for camera_id, state in inventory.cameras.items()
+    ]
+
+
+metrics.gauge_collector(collect_runtime_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.post("/predict")
-async def predict(file: UploadFile = File(...)):
-    if "session" not in model_assets: raise HTTPException(status_code=503)
+async def predict(response: Response, file: UploadFile = File(...), camera_id: str = Form(DEFAULT_CAMERA_ID),
+                  tiled: Optional[bool] = Form(None)):
+    if "engine" not in model_assets: raise HTTPException(status_code=503)
+    t_start = time.perf_counter()
+    admit_cameras([camera_id])
+    tiled = use_tiling(camera_id, tiled)
     try:
         contents = await file.read()
-        image = Image.open(io.BytesIO(contents)).convert("RGB")
-        input_img = image.resize((INPUT_SIZE, INPUT_SIZE), resample=Image.BILINEAR)
-        input_data = np.array(input_img).astype(np.float32) / 255.0
-        input_data = input_data.transpose(2, 0, 1)
-        input_data = np.expand_dims(input_data, axis=0)
-
-        outputs = model_assets["session"].run(None, {model_assets["input_name"]: input_data})
-        indices, _, _ = get_processed_detections(np.squeeze(outputs[0]).T, (image.height, image.width))
-        count = len(indices.flatten()) if len(indices) > 0 else 0
-        update_inventory_status(count)
-        return {"success": True, "count": count}
+        check_raw_frame(contents)
+        boxes, _, timings, reused = await run_detection(contents, camera_id, tiled)
+        count = len(boxes)
+        await update_inventory_status(count, camera_id)
+        response.headers["Server-Timing"] = server_timing(timings)
+        return {
+            "success": True,
+            "count": count,
+            "reused": reused,
+            "tiled": tiled,
+            "engine": model_assets["engine"].name,
+            "inference_time_ms": round((time.perf_counter() - t_start) * 1000, 2),
+            "timings_ms": {stage: round(ms, 2) for stage, ms in timings.items()}
+        }
+    except (OverloadedError, HTTPException):
+        raise
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
-@app.post("/verify-image")
-async def verify_image(file: UploadFile = File(...)):
-    """Inspector endpoint fixed with RGB conversion for accuracy."""
-    if "session" not in model_assets:
-        raise HTTPException(status_code=503)
-
-    try:
-        contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        orig_h, orig_w = img.shape[:2]
+def detection_result(boxes, scores, include_boxes):
+    result = {"success": True, "count": len(boxes)}
+    if include_boxes:
+        result["boxes"] = boxes.tolist()
+        # Rounded in float64: float32 values would print as 0.32499998807907104
+        result["scores"] = np.round(scores.astype(np.float64), 3).tolist()
+    return result
 
-        # correction of the image
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
-        input_img = cv2.resize(img_rgb, (INPUT_SIZE, INPUT_SIZE), interpolation=cv2.INTER_AREA)
-        input_data = input_img.astype(np.float32) / 255.0
-        input_data = input_data.transpose(2, 0, 1)
-        input_data = np.expand_dims(input_data, axis=0)
+@app.post("/predict-batch")
+async def predict_batch(files: List[UploadFile] = File(...), camera_ids: str = Form(""),
+                        include_boxes: bool = Form(False)):
+    """Runs many images (files or one zip/tar archive) through the model in one request.
 
-        outputs = model_assets["session"].run(None, {model_assets["input_name"]: input_data})
+    Results come back in input order; a bad image only fails its own entry,
+    while a full queue fails the whole request with 503. `camera_ids` is an optional comma-separated list, one per image, whose
+    inventory states are updated like /predict would.
+    """
+    if "engine" not in model_assets:
+        raise HTTPException(status_code=503)
 
-        #NMS
-        indices, boxes, confidences = get_processed_detections(np.squeeze(outputs[0]).T, (orig_h, orig_w))
+    # Limits are checked before the uploads are read into memory
+    if len(files) > MAX_BATCH_IMAGES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_IMAGES} images per batch")
+    too_large = HTTPException(status_code=413, detail=f"At most {MAX_BATCH_BYTES // (1024 * 1024)} MB per batch")
+    uploads, total_bytes = [], 0
+    for file in files:
+        if total_bytes + (file.size or 0) > MAX_BATCH_BYTES:
+            raise too_large
+        contents = await file.read()
+        total_bytes += len(contents)
+        if total_bytes > MAX_BATCH_BYTES:
+            raise too_large
+        uploads.append((file.filename, contents))
+    if len(uploads) == 1 and is_archive(*uploads[0]):
+        try:
+            uploads = await model_assets["cpu_pool"].run(
+                extract_images, uploads[0][1], MAX_BATCH_IMAGES, MAX_BATCH_BYTES
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    cameras = [camera.strip() for camera in camera_ids.split(",")] if camera_ids else [None] * len(uploads)
+    if len(cameras) != len(uploads):
+        raise HTTPException(status_code=400, detail="camera_ids must list one camera per image")
+    admit_cameras(cameras)
+
+    # Chunks of one model batch keep the worker pool and batcher queues within bounds
+    chunk = model_assets["batcher"].max_batch_size
+    results = []
+    for start in range(0, len(uploads), chunk):
+        part = list(zip(uploads[start:start + chunk], cameras[start:start + chunk]))
+        detections = await asyncio.gather(
+            *(run_detection(contents, camera, use_tiling(camera)) for (_, contents), camera in part),
+            return_exceptions=True
+        )
+        # A full queue is the server's problem, not the image's: 503 + Retry-After for the whole request
+        overloaded = next((d for d in detections if isinstance(d, OverloadedError)), None)
+        if overloaded is not None:
+            raise overloaded
+        for offset, (((filename, _), camera), detection) in enumerate(zip(part, detections)):
+            entry = {"index": start + offset, "filename": filename}
+            if isinstance(detection, Exception):
+                entry.update({"success": False, "error": str(detection) or type(detection).__name__})
+            else:
+                boxes, scores, _, _ = detection
+                entry.update(detection_result(boxes, scores, include_boxes))
+                if camera:
+                    await update_inventory_status(len(boxes), camera)
+            results.append(entry)
+
+    return {"success": True, "images": len(results), "results": results}
 
-        if len(indices) > 0:
-            for i in indices.flatten():
-                x, y, w, h = boxes[i]
-                cv2.rectangle(img, (x, y), (x + w, y + h), (138, 43, 226), 3)
 
-        _, buffer = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
-        return StreamingResponse(io.BytesIO(buffer.tobytes()), media_type="image/jpeg")
+@app.post("/verify-image")
+async def verify_image(
+    response: Response,
+    file: UploadFile = File(...),
+    output: str = Form("json"),
+    max_dim: int = Form(0),
+    quality: int = Form(85),
+    tiled: bool = Form(False)
+):
+    """Inspector endpoint: detections as JSON (default), or an annotated JPEG/WebP preview.
+
+    JSON mode skips image encoding entirely; the inspector draws the boxes
+    over its local copy of the file. `max_dim` bounds the longer side of
+    image previews (0 = original size). `tiled` uses sliced inference.
+    """
+    if "engine" not in model_assets:
+        raise HTTPException(status_code=503)
+    if output not in VERIFY_OUTPUTS:
+        raise HTTPException(status_code=400, detail=f"output must be one of {', '.join(VERIFY_OUTPUTS)}")
+    if not 1 <= quality <= 100 or not 0 <= max_dim <= MAX_PREVIEW_DIM:
+        raise HTTPException(status_code=400, detail=f"quality must be 1-100 and max_dim 0-{MAX_PREVIEW_DIM}")
 
+    try:
+        contents = await file.read()
+        if is_raw_frame(contents):
+            raise HTTPException(status_code=400, detail="The inspector needs an encoded image, not a raw frame")
+        boxes, scores, timings, _ = await run_detection(contents, tiled=tiled)
+
+        if output == "json":
+            width, height = image_size(contents)
+            response.headers["Server-Timing"] = server_timing(timings)
+            return {
+                **detection_result(boxes, scores, include_boxes=True),
+                "width": width,
+                "height": height,
+                "timings_ms": {stage: round(ms, 2) for stage, ms in timings.items()}
+            }
+
+        # Only the drawing is redone for cached frames
+        image_bytes, timings["encode"] = await model_assets["cpu_pool"].run(
+            timed, annotate_and_encode, contents, boxes, output, max_dim, quality
+        )
+        stage_duration.observe(timings["encode"] / 1000, "encode")
+        return StreamingResponse(io.BytesIO(image_bytes), media_type=f"image/{output}",
+                                 headers={"Server-Timing": server_timing(timings)})
+
+    except (OverloadedError, HTTPException):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -191,16 +961,22 @@ async def verify_image(file: UploadFile = File(...)):
 class ThresholdSettings(BaseModel):
     min: int
     max: int
+    camera_id: str = DEFAULT_CAMERA_ID
 
 
 @app.post("/update-settings")
 async def update_settings(settings: ThresholdSettings):
+    admit_cameras([settings.camera_id])
     try:
-        inventory_state["critical_threshold"] = settings.min
-        inventory_state["full_capacity"] = settings.max
-
-        if inventory_state["last_check"] != "Never":
-            update_inventory_status(inventory_state["current_count"])
+        state = inventory.get(settings.camera_id)
+        if "shared_state" in services:
+            shared = services["shared_state"]
+            await shared.run(shared.append_thresholds, settings.camera_id, settings.min, settings.max)
+            await sync_shared_state()
+        else:
+            before = state.fields()
+            state.set_thresholds(settings.min, settings.max)
+            publish_change(state, before)
         return {"success": True, "updated": settings}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
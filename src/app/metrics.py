@@ -0,0 +1,154 @@
+import time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observing is one bisect and two additions."""
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, value, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        names = self.label_names + ("le",)
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{format_labels(names, labels + (le,))} {cumulative}")
+            base = format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{base} {total}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Minimal Prometheus text-format registry.
+
+    Counters and histograms are updated in place from the event loop;
+    gauges are collected from callbacks only when /metrics is scraped, so
+    they cost nothing on the request path.
+    """
+
+    def __init__(self, prefix="inventory"):
+        self.prefix = prefix
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, label_names=()):
+        metric = Counter(f"{self.prefix}_{name}", help_text, tuple(label_names))
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(f"{self.prefix}_{name}", help_text, tuple(label_names), buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge_collector(self, collect):
+        """Registers a callback yielding (name, help, label_names, [(label_values, value)])."""
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for name, help_text, label_names, samples in collect():
+                full_name = f"{self.prefix}_{name}"
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} gauge")
+                for label_values, value in samples:
+                    lines.append(f"{full_name}{format_labels(label_names, label_values)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def server_timing(timings):
+    """Server-Timing header value from a {stage: ms} dict."""
+    return ", ".join(f"{stage};dur={ms:.2f}" for stage, ms in timings.items())
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and adding the total to Server-Timing.
+
+    Paths outside the app's routes are grouped under "other" to keep label
+    cardinality bounded. Server-sent event streams are counted but not
+    timed: their duration is how long a dashboard stayed open.
+    """
+
+    def __init__(self, app, requests_total, request_duration, known_paths):
+        self.app = app
+        self.requests_total = requests_total
+        self.request_duration = request_duration
+        self.known_paths = known_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"] if scope["path"] in self.known_paths() else "other"
+        t_start = time.perf_counter()
+        status = [500]
+        event_stream = [False]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                event_stream[0] = any(
+                    name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", [])
+                )
+                elapsed_ms = (time.perf_counter() - t_start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", f"total;dur={elapsed_ms:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.requests_total.inc(scope["method"], path, status[0])
+            if not event_stream[0]:
+                self.request_duration.observe(time.perf_counter() - t_start, path)
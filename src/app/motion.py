@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+SIGNATURE_SIZE = 64
+CHANGE_GRID = 8  # The thumbnail is compared as 8x8 blocks, each 1/64 of the frame
+
+
+def scene_signature(pixels):
+    """Downscaled grayscale thumbnail used to compare consecutive frames."""
+    gray = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+    return cv2.resize(gray, (SIGNATURE_SIZE, SIGNATURE_SIZE), interpolation=cv2.INTER_AREA)
+
+
+def scene_change(signature_a, signature_b):
+    """Largest mean absolute difference over the signatures' blocks (0-255).
+
+    One package taken off a shelf changes a few percent of the frame; a mean
+    over the whole thumbnail averages that below sensor noise, the worst
+    block does not.
+    """
+    diff = cv2.absdiff(signature_a, signature_b).astype(np.float32)
+    return float(cv2.resize(diff, (CHANGE_GRID, CHANGE_GRID), interpolation=cv2.INTER_AREA).max())
+
+
+class MotionGate:
+    """Per-camera change detector that lets static scenes reuse the last detections.
+
+    A frame is compared with the last frame that actually went through the
+    model (`scene_change` of 64x64 grayscale thumbnails, 0-255). Below
+    `threshold` the previous result is reused, unless more than
+    `max_skip_seconds` have passed since the last real inference. At most
+    `max_cameras` frames are kept; the least recently inferred camera is
+    dropped first.
+    """
+
+    def __init__(self, threshold=8.0, max_skip_seconds=30.0, max_cameras=1000):
+        self.threshold = threshold
+        self.max_skip_seconds = max_skip_seconds
+        self.max_cameras = max_cameras
+        self.checked = 0
+        self.skipped = 0
+        self.avg_inference_ms = 0.0
+        self._cameras = OrderedDict()
+
+    def lookup(self, camera_id, signature):
+        """Returns the reusable (boxes, scores) for this frame, or None if it needs inference."""
+        self.checked += 1
+        last = self._cameras.get(camera_id)
+        if last is None:
+            return None
+
+        last_signature, result, inferred_at = last
+        if time.monotonic() - inferred_at > self.max_skip_seconds:
+            return None
+        if last_signature.shape != signature.shape:
+            return None
+        if scene_change(last_signature, signature) >= self.threshold:
+            return None
+
+        self.skipped += 1
+        return result
+
+    def store(self, camera_id, signature, boxes, scores, inference_ms):
+        self._cameras[camera_id] = (signature, (boxes, scores), time.monotonic())
+        self._cameras.move_to_end(camera_id)
+        if len(self._cameras) > self.max_cameras:
+            self._cameras.popitem(last=False)
+        # Moving average of what a skipped frame would have cost
+        self.avg_inference_ms = inference_ms if self.avg_inference_ms == 0 else (
+            0.9 * self.avg_inference_ms + 0.1 * inference_ms
+        )
+
+    def stats(self):
+        return {
+            "threshold": self.threshold,
+            "cameras": len(self._cameras),
+            "max_skip_seconds": self.max_skip_seconds,
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / self.checked, 3) if self.checked else 0.0,
+            "avg_inference_ms": round(self.avg_inference_ms, 2),
+            "cpu_saved_ms": round(self.skipped * self.avg_inference_ms, 1),
+        }
@@ -0,0 +1,89 @@
+import numpy as np
+
+# The server's operating point; the training and benchmark scripts import these so
+# every metric is measured with the filtering production applies
+CONFIDENCE_THRESHOLD = 0.30
+NMS_THRESHOLD = 0.45
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU of (x, y, w, h) boxes."""
+    a1, a2 = boxes_a[:, None, :2], boxes_a[:, None, :2] + boxes_a[:, None, 2:]
+    b1, b2 = boxes_b[None, :, :2], boxes_b[None, :, :2] + boxes_b[None, :, 2:]
+    overlap = np.clip(np.minimum(a2, b2) - np.maximum(a1, b1), 0, None).prod(axis=2)
+    union = boxes_a[:, None, 2:].prod(axis=2) + boxes_b[None, :, 2:].prod(axis=2) - overlap
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, overlap / union, 0.0)
+
+
+def nms(boxes, scores, iou_threshold):
+    """Greedy non-maximum suppression on integer (x, y, w, h) boxes.
+
+    Mirrors cv2.dnn.NMSBoxes: candidates are visited by descending score
+    (stable on ties) and a box is dropped when its IoU with a kept box is
+    above `iou_threshold`. Returns the kept indices in visit order.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    areas = boxes[:, 2].astype(np.float64) * boxes[:, 3]
+
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w.astype(np.float64) * inter_h
+        union = areas[i] + areas[rest] - inter
+
+        # Degenerate (zero-area) pairs count as full overlap, like OpenCV
+        with np.errstate(divide="ignore", invalid="ignore"):
+            iou = np.where(union > 0, inter / union, 1.0)
+        order = rest[iou.astype(np.float32) <= np.float32(iou_threshold)]
+
+    return np.asarray(keep, dtype=np.intp)
+
+
+def _process_single(output, orig_size, input_size, conf_threshold, nms_threshold):
+    orig_h, orig_w = orig_size
+    scale_x, scale_y = orig_w / input_size, orig_h / input_size
+
+    # Filter on the raw (5, N) layout: only the surviving columns get copied
+    candidates = output[:, output[4] > np.float32(conf_threshold)].astype(np.float64)
+    if candidates.shape[1] == 0:
+        return np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32)
+
+    cx, cy, w, h = candidates[0] * scale_x, candidates[1] * scale_y, candidates[2], candidates[3]
+    w = np.trunc(w * scale_x)
+    h = np.trunc(h * scale_y)
+    x = np.trunc(cx - w / 2)
+    y = np.trunc(cy - h / 2)
+
+    boxes = np.stack([x, y, w, h], axis=1).astype(np.int32)
+    scores = candidates[4].astype(np.float32)
+
+    keep = nms(boxes, scores, nms_threshold)
+    return boxes[keep], scores[keep]
+
+
+def get_processed_detections(output, orig_size, input_size, conf_threshold=CONFIDENCE_THRESHOLD,
+                             nms_threshold=NMS_THRESHOLD):
+    """Confidence filtering, box scaling and NMS on raw YOLO output.
+
+    `output` is the model's (5, N) slice for one image, or a (B, 5, N) batch
+    with one (height, width) per image in `orig_size`. Returns `(boxes,
+    scores)` with boxes as int32 (x, y, w, h) in original image coordinates,
+    or a list of those pairs for a batch.
+    """
+    if output.ndim == 3:
+        return [
+            _process_single(output[i], orig_size[i], input_size, conf_threshold, nms_threshold)
+            for i in range(output.shape[0])
+        ]
+    return _process_single(output, orig_size, input_size, conf_threshold, nms_threshold)
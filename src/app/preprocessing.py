@@ -0,0 +1,79 @@
+import io
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from raw_frames import decode_raw_frame, is_raw_frame
+
+
+class PreparedImage:
+    """Model-sized RGB pixels plus what the endpoints need to map results back."""
+
+    def __init__(self, pixels, orig_size, timings):
+        self.pixels = pixels
+        self.orig_size = orig_size
+        self.timings = timings
+
+
+def decode_image(contents, target_size):
+    """Decodes an upload to an RGB uint8 array as cheaply as the format allows.
+
+    JPEGs much larger than the model input are decoded at reduced resolution
+    (libjpeg DCT scaling via PIL's draft mode), which skips most of the work
+    for 12 MP photos. Returns the pixels and the original (height, width).
+    """
+    image = Image.open(io.BytesIO(contents))
+    orig_w, orig_h = image.size
+
+    if image.format == "JPEG":
+        image.draft("RGB", (target_size, target_size))
+
+    pixels = np.asarray(image.convert("RGB"))
+    return pixels, (orig_h, orig_w)
+
+
+def image_size(contents):
+    """(width, height) of an encoded image, read from its header without decoding."""
+    with Image.open(io.BytesIO(contents)) as image:
+        return image.size
+
+
+def prepare_image(contents, input_size):
+    """Shared decode + resize path used by every endpoint.
+
+    Accepts encoded images and raw frames (see raw_frames); raw frames that
+    are already model-sized go to the model without decoding or copying.
+    """
+    t_start = time.perf_counter()
+    if is_raw_frame(contents):
+        pixels, orig_size = decode_raw_frame(contents)
+    else:
+        pixels, orig_size = decode_image(contents, input_size)
+    t_decoded = time.perf_counter()
+
+    if pixels.shape[:2] != (input_size, input_size):
+        pixels = cv2.resize(pixels, (input_size, input_size), interpolation=cv2.INTER_AREA)
+    t_resized = time.perf_counter()
+
+    timings = {
+        "decode": (t_decoded - t_start) * 1000,
+        "preprocess": (t_resized - t_decoded) * 1000,
+    }
+    return PreparedImage(pixels, orig_size, timings)
+
+
+def prepare_frame(frame, input_size):
+    """Model-sized RGB pixels for an already decoded BGR video frame (see streams)."""
+    t_start = time.perf_counter()
+    pixels = cv2.resize(frame, (input_size, input_size), interpolation=cv2.INTER_AREA)
+    pixels = cv2.cvtColor(pixels, cv2.COLOR_BGR2RGB)
+    timings = {"preprocess": (time.perf_counter() - t_start) * 1000}
+    return PreparedImage(pixels, frame.shape[:2], timings)
+
+
+def fill_input_tensor(pixels, out):
+    """Writes HWC uint8 pixels into a preallocated CHW float32 slot, scaled to [0, 1]."""
+    np.divide(pixels.transpose(2, 0, 1), np.float32(255.0), out=out)
+    return out
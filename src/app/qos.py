@@ -0,0 +1,127 @@
+import time
+from collections import deque
+
+import numpy as np
+
+MIN_SAMPLES = 10
+
+
+class ResolutionController:
+    """Keeps inference latency under a target by trading input resolution, then per-camera rate.
+
+    Latencies of requests that ran the model are collected, and every
+    `interval_seconds`, if their p95 is over `target_ms` the
+    input size steps down the `sizes` ladder; at the smallest size the
+    throttle level goes up instead, and each level halves how often a
+    camera's frames are inferred. When p95 is under half the target, or
+    no request needed the model for a whole interval, it steps back the
+    same way: throttle first, then up the ladder to the largest size. A
+    target of 0 disables it and keeps `default_size`.
+    """
+
+    def __init__(self, sizes, default_size, target_ms=0.0, interval_seconds=2.0, max_throttle=2, history=50):
+        self.sizes = sorted(set(sizes) | {default_size})
+        self.default_size = default_size
+        self.target_ms = target_ms
+        self.interval = interval_seconds
+        self.max_throttle = max_throttle
+        self.level = self.sizes.index(default_size)
+        self.throttle_level = 0
+        self.counts = {"degrade": 0, "restore": 0, "throttle": 0, "unthrottle": 0}
+        self.events = deque(maxlen=history)
+        self._samples = []
+        self._evaluated_at = time.monotonic()
+        self._last_results = {}
+
+    @property
+    def enabled(self):
+        return self.target_ms > 0 and (len(self.sizes) > 1 or self.max_throttle > 0)
+
+    def disable(self, reason):
+        """Pins the default size, e.g. for a model exported with a fixed input shape."""
+        self.target_ms = 0.0
+        self.level = self.sizes.index(self.default_size)
+        self.throttle_level = 0
+        self._record("disabled", self.default_size, self.default_size, reason)
+
+    def input_size(self):
+        """The input size for the next request; re-evaluates the ladder once per interval."""
+        if self.enabled:
+            self._maybe_adjust()
+        return self.sizes[self.level]
+
+    def rate_divisor(self):
+        """How many times fewer frames each camera gets inferred at the current throttle level."""
+        return 2 ** self.throttle_level
+
+    def observe(self, latency_ms):
+        if self.enabled:
+            self._samples.append(latency_ms)
+
+    def observe_overload(self):
+        """A request rejected by a full queue counts as one far over the target."""
+        self.observe(float("inf"))
+
+    def remember(self, camera_id, boxes, scores):
+        if self.enabled:
+            self._last_results[camera_id] = (boxes, scores, time.monotonic())
+
+    def throttled_result(self, camera_id, min_interval_seconds):
+        """The camera's last result while throttled, if it is more recent than the reduced rate allows."""
+        if not self.throttle_level:
+            return None
+        last = self._last_results.get(camera_id)
+        if last is None or time.monotonic() - last[2] >= min_interval_seconds * self.rate_divisor():
+            return None
+        return last[:2]
+
+    def _maybe_adjust(self):
+        now = time.monotonic()
+        if now - self._evaluated_at < self.interval:
+            return
+        samples, self._samples = self._samples, []
+        size = self.sizes[self.level]
+        if len(samples) >= MIN_SAMPLES:
+            p95 = float(np.percentile(samples, 95, method="higher"))
+        elif not samples:
+            p95 = 0.0  # Idle for a whole interval
+        else:
+            self._samples = samples  # Too few to judge, keep collecting
+            return
+
+        if p95 > self.target_ms:
+            if self.level > 0:
+                self.level -= 1
+                self._record("degrade", size, self.sizes[self.level], p95)
+            elif self.throttle_level < self.max_throttle:
+                self.throttle_level += 1
+                self._record("throttle", size, size, p95)
+        elif p95 < self.target_ms / 2:
+            if self.throttle_level > 0:
+                self.throttle_level -= 1
+                self._record("unthrottle", size, size, p95)
+            elif self.level < len(self.sizes) - 1:
+                self.level += 1
+                self._record("restore", size, self.sizes[self.level], p95)
+        self._evaluated_at = now
+
+    def _record(self, event, from_size, to_size, detail):
+        self.counts[event] = self.counts.get(event, 0) + 1
+        entry = {"time": time.time(), "event": event, "from": from_size, "to": to_size}
+        if isinstance(detail, str):
+            entry["reason"] = detail
+        else:
+            entry["p95_ms"] = round(detail, 1) if np.isfinite(detail) else None
+        self.events.append(entry)
+        print(f"QoS {event}: input {from_size} -> {to_size}, throttle level {self.throttle_level}")
+
+    def summary(self, recent=5):
+        return {
+            "enabled": self.enabled,
+            "input_size": self.sizes[self.level],
+            "sizes": self.sizes,
+            "throttle_level": self.throttle_level,
+            "target_ms": self.target_ms,
+            "events": self.counts,
+            "recent_events": list(self.events)[-recent:],
+        }
@@ -0,0 +1,107 @@
+"""Raw frame ingest format for smart cameras that resize on the device.
+
+A frame is a 20-byte little-endian header followed by H*W*3 RGB uint8
+pixels, optionally compressed:
+
+    magic       4s  b"INVR"
+    version     B   1
+    compression B   0 = none, 1 = lz4 frame, 2 = zstd
+    channels    B   3
+    reserved    B   0
+    height      H   pixel rows in the payload
+    width       H   pixel columns in the payload
+    orig_height I   size of the camera image before resizing, used to map
+    orig_width  I   boxes back to camera coordinates (0 = same as payload)
+"""
+import struct
+
+import numpy as np
+
+MAGIC = b"INVR"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBHHII")
+COMPRESSION_NONE, COMPRESSION_LZ4, COMPRESSION_ZSTD = 0, 1, 2
+# Frames are squashed to the model input or tiled at TILE_MAX_DIM (960 by default), so larger
+# payloads only cost memory: the header alone decides how much a payload may expand to
+MAX_RAW_DIM = 2048
+# Camera sensors stay well below this; the original size only maps boxes back
+MAX_ORIG_DIM = 16384
+
+
+class RawFrameTooLarge(ValueError):
+    """The header declares a payload larger than MAX_RAW_DIM on a side."""
+
+
+def is_raw_frame(contents):
+    return contents[:4] == MAGIC
+
+
+def _decompress(payload, compression, expected):
+    """Decompresses at most `expected` bytes, so a small upload can't expand into a huge buffer."""
+    # Codecs are optional dependencies, only needed by cameras that compress
+    if compression == COMPRESSION_LZ4:
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ValueError("LZ4 frames require the 'lz4' package")
+        decompressor = lz4.frame.LZ4FrameDecompressor()
+        pixels = decompressor.decompress(payload, max_length=expected)
+        if not decompressor.eof:
+            raise ValueError(f"LZ4 payload is truncated or larger than the expected {expected} bytes")
+        return pixels
+    if compression == COMPRESSION_ZSTD:
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd frames require the 'zstandard' package")
+        # A declared content size is allocated up front, so it must match before decompressing
+        declared = zstandard.frame_content_size(payload)
+        if declared not in (-1, expected):
+            raise ValueError(f"zstd payload declares {declared} bytes, expected {expected}")
+        try:
+            return zstandard.ZstdDecompressor().decompress(payload, max_output_size=expected)
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Invalid zstd payload: {e}")
+    raise ValueError(f"Unknown compression code {compression}")
+
+
+def read_header(contents):
+    """Validated (compression, height, width, orig_height, orig_width) of a raw frame.
+
+    Raises RawFrameTooLarge for payloads over MAX_RAW_DIM and ValueError for
+    anything else malformed, before a byte of the payload is touched.
+    """
+    if len(contents) < HEADER.size:
+        raise ValueError("Raw frame shorter than its header")
+    magic, version, compression, channels, _, height, width, orig_h, orig_w = HEADER.unpack_from(contents)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a supported raw frame")
+    if channels != 3:
+        raise ValueError("Raw frames must be RGB (3 channels)")
+    if height == 0 or width == 0:
+        raise ValueError("Raw frame has an empty payload size")
+    if height > MAX_RAW_DIM or width > MAX_RAW_DIM:
+        raise RawFrameTooLarge(f"Raw frame is {width}x{height}, at most {MAX_RAW_DIM} per side is accepted")
+    if (orig_h == 0) != (orig_w == 0) or orig_h > MAX_ORIG_DIM or orig_w > MAX_ORIG_DIM:
+        raise ValueError(f"Raw frame original size {orig_w}x{orig_h} is invalid")
+    return compression, height, width, orig_h, orig_w
+
+
+def decode_raw_frame(contents):
+    """Wraps a raw frame as an (H, W, 3) uint8 array and returns it with the original (height, width).
+
+    Uncompressed payloads are not copied: the array is a read-only view on
+    the request bytes.
+    """
+    compression, height, width, orig_h, orig_w = read_header(contents)
+    channels = 3
+    expected = height * width * channels
+    payload = memoryview(contents)[HEADER.size:]
+    if compression != COMPRESSION_NONE:
+        payload = _decompress(payload, compression, expected)
+
+    if len(payload) != expected:
+        raise ValueError(f"Raw frame payload is {len(payload)} bytes, expected {expected}")
+
+    pixels = np.frombuffer(payload, dtype=np.uint8).reshape(height, width, channels)
+    return pixels, (orig_h or height, orig_w or width)
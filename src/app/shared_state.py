@@ -0,0 +1,127 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+COUNT, THRESHOLDS = 0, 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS updates (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    camera_id TEXT NOT NULL,
+    kind INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    count INTEGER,
+    critical_threshold INTEGER,
+    full_capacity INTEGER
+);
+CREATE TABLE IF NOT EXISTS thresholds (
+    camera_id TEXT PRIMARY KEY,
+    critical_threshold INTEGER NOT NULL,
+    full_capacity INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+RECENT_UPDATES = """
+SELECT seq, camera_id, kind, ts, count, critical_threshold, full_capacity FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY camera_id ORDER BY seq DESC) AS age
+    FROM updates
+) WHERE age <= ? ORDER BY seq
+"""
+
+
+class SharedStateLog:
+    """Ordered log of inventory changes shared by the uvicorn worker processes.
+
+    Each worker keeps its own in-memory InventoryRegistry and replays the
+    log into it in `seq` order, its own writes included, so every process
+    ends up with the same counts, thresholds and ring buffers. SQLite in WAL
+    mode serialises the appends; reads never block writers. Old entries are
+    pruned; the current thresholds are kept in their own table so pruning
+    never loses settings.
+
+    The methods block on SQLite, including up to the busy timeout while
+    another worker holds the write lock; the server calls them through
+    `run`, which executes them one at a time on the log's own thread.
+    """
+
+    def __init__(self, path, retain=10000, prune_every=1000):
+        self.path = str(path)
+        self.retain = retain
+        self.prune_every = prune_every
+        self.cursor = 0
+        self.appended = 0
+        self.applied = 0
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # Created here, then only ever used from the single executor thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-state")
+        self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    async def run(self, fn, *args):
+        """Awaits `fn(*args)` on the log's thread, keeping SQLite's locks and busy waits off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def close(self):
+        self._executor.submit(self._conn.close)
+        self._executor.shutdown(wait=True)
+
+    def append_count(self, camera_id, count, timestamp=None):
+        self._append(camera_id, COUNT, timestamp, count, None, None)
+
+    def append_thresholds(self, camera_id, critical_threshold, full_capacity, timestamp=None):
+        self._append(camera_id, THRESHOLDS, timestamp, None, critical_threshold, full_capacity)
+
+    def _append(self, camera_id, kind, timestamp, count, critical_threshold, full_capacity):
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "INSERT INTO updates (camera_id, kind, ts, count, critical_threshold, full_capacity) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (camera_id, kind, timestamp, count, critical_threshold, full_capacity)
+            )
+            if kind == THRESHOLDS:
+                self._conn.execute(
+                    "INSERT INTO thresholds VALUES (?, ?, ?) ON CONFLICT (camera_id) DO UPDATE SET "
+                    "critical_threshold = excluded.critical_threshold, full_capacity = excluded.full_capacity",
+                    (camera_id, critical_threshold, full_capacity)
+                )
+        self.appended += 1
+        if self.appended % self.prune_every == 0:
+            self.prune()
+
+    def read_new(self):
+        """Log entries this process has not applied yet, oldest first; advances the cursor."""
+        rows = self._conn.execute(
+            "SELECT seq, camera_id, kind, ts, count, critical_threshold, full_capacity "
+            "FROM updates WHERE seq > ? ORDER BY seq",
+            (self.cursor,)
+        ).fetchall()
+        if rows:
+            self.cursor = rows[-1][0]
+            self.applied += len(rows)
+        return rows
+
+    def snapshot(self, per_camera):
+        """Current thresholds plus the last `per_camera` entries of each camera, for a starting worker."""
+        # One read transaction, so no append can slip between the snapshot and the cursor
+        with self._conn:
+            self._conn.execute("BEGIN")
+            thresholds = self._conn.execute("SELECT * FROM thresholds").fetchall()
+            rows = self._conn.execute(RECENT_UPDATES, (per_camera,)).fetchall()
+            self.cursor = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM updates").fetchone()[0]
+        return thresholds, rows
+
+    def prune(self):
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM updates WHERE seq <= (SELECT MAX(seq) FROM updates) - ?", (self.retain,)
+            )
+
+    def stats(self):
+        return {"path": self.path, "cursor": self.cursor, "appended": self.appended, "applied": self.applied}
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit, urlunsplit
+
+import cv2
+import numpy as np
+
+from workers import OverloadedError
+
+
+def parse_streams(spec):
+    """`camera=source,camera=source` -> {camera_id: source}; the source may itself contain '='."""
+    streams = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        camera_id, sep, source = entry.partition("=")
+        if not sep or not camera_id.strip() or not source.strip():
+            raise ValueError(f"Stream entry '{entry}' is not camera=source")
+        streams[camera_id.strip()] = source.strip()
+    return streams
+
+
+def redact(source):
+    """The source without credentials, for status output."""
+    parts = urlsplit(source)
+    if parts.username is None:
+        return source
+    host = parts.hostname + (f":{parts.port}" if parts.port else "")
+    return urlunsplit(parts._replace(netloc=host))
+
+
+def summarize_ms(samples):
+    if not samples:
+        return {"avg": 0.0, "p95": 0.0}
+    values = np.fromiter(samples, dtype=np.float64) * 1000
+    return {"avg": round(float(values.mean()), 2), "p95": round(float(np.percentile(values, 95)), 2)}
+
+
+class VideoStream:
+    """Pulls frames from a camera stream or video file and infers the newest one at a fixed rate.
+
+    Decoding runs on its own thread and only ever keeps the latest frame:
+    a frame replaced before the inference side took it counts as dropped,
+    so a slow model never builds a backlog of stale frames. Sources are
+    anything cv2.VideoCapture opens (RTSP, HTTP MJPEG, local files); local
+    files play at their own frame rate and can loop, to stand in for a
+    live camera. Network sources are reopened after a failure.
+    """
+
+    def __init__(self, camera_id, source, inference_fps=1.0, loop_files=True, reconnect_seconds=2.0):
+        self.camera_id = camera_id
+        self.source = source
+        self.interval = 1.0 / inference_fps
+        self.loop_files = loop_files
+        self.reconnect_seconds = reconnect_seconds
+        self.is_file = os.path.exists(source)
+        self.state = "stopped"
+        self.last_error = None
+
+        self.decoded = 0
+        self.dropped = 0
+        self.inferred = 0
+        self.skipped = 0  # Sampled frames rejected because the server was overloaded
+        self.errors = 0
+        self.reconnects = 0
+        self.decode_times = deque(maxlen=200)
+        self.frame_ages = deque(maxlen=200)  # Capture -> picked up for inference
+        self.result_lags = deque(maxlen=200)  # Capture -> count published
+
+        self._lock = threading.Lock()
+        self._latest = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._new_frame = None
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.reconnect_seconds + 1)
+        self.state = "stopped"
+
+    def take_latest(self):
+        """The newest (frame, captured_at) not yet taken, or None."""
+        with self._lock:
+            latest, self._latest = self._latest, None
+        return latest
+
+    async def run(self, process, slowdown=None):
+        """Starts the decode thread and calls `await process(camera_id, bgr_frame)` at the inference rate.
+
+        `slowdown()`, if given, divides the rate, so the server can shed load by sampling less often.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._new_frame = asyncio.Event()
+        self._thread = threading.Thread(target=self._read_frames, name=f"stream-{self.camera_id}", daemon=True)
+        self._thread.start()
+
+        next_at = self._loop.time()
+        while True:
+            await self._new_frame.wait()
+            self._new_frame.clear()
+            delay = next_at - self._loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            latest = self.take_latest()
+            if latest is None:
+                continue
+            frame, captured_at = latest
+            self.frame_ages.append(time.perf_counter() - captured_at)
+            try:
+                await process(self.camera_id, frame)
+                self.inferred += 1
+                self.result_lags.append(time.perf_counter() - captured_at)
+            except OverloadedError:
+                self.skipped += 1
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+            next_at = max(next_at + self.interval * (slowdown() if slowdown else 1), self._loop.time())
+
+    def _read_frames(self):
+        while not self._stop.is_set():
+            capture = cv2.VideoCapture(self.source)
+            if not capture.isOpened():
+                self.state = "reconnecting"
+                self.last_error = f"Cannot open {redact(self.source)}"
+                self._stop.wait(self.reconnect_seconds)
+                continue
+
+            self.state = "running"
+            fps = capture.get(cv2.CAP_PROP_FPS) if self.is_file else 0
+            frame_interval = 1.0 / fps if fps > 0 else 0.0
+            next_at = time.perf_counter()
+            while not self._stop.is_set():
+                t_start = time.perf_counter()
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                captured_at = time.perf_counter()
+                self.decode_times.append(captured_at - t_start)
+                self.decoded += 1
+                with self._lock:
+                    if self._latest is not None:
+                        self.dropped += 1
+                    self._latest = (frame, captured_at)
+                try:
+                    self._loop.call_soon_threadsafe(self._new_frame.set)
+                except RuntimeError:  # Event loop closed during shutdown
+                    self._stop.set()
+                    break
+                # Files decode far faster than real time; pace them like a camera would
+                if frame_interval:
+                    next_at += frame_interval
+                    self._stop.wait(max(0.0, next_at - time.perf_counter()))
+            capture.release()
+
+            if self.is_file and not self.loop_files:
+                self.state = "ended"
+                return
+            if not self.is_file and not self._stop.is_set():
+                self.reconnects += 1
+                self.state = "reconnecting"
+                self._stop.wait(self.reconnect_seconds)
+
+    def stats(self):
+        return {
+            "camera_id": self.camera_id,
+            "source": redact(self.source),
+            "state": self.state,
+            "inference_fps": round(1.0 / self.interval, 2),
+            "frames_decoded": self.decoded,
+            "frames_dropped": self.dropped,
+            "frames_inferred": self.inferred,
+            "frames_skipped": self.skipped,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+            "decode_ms": summarize_ms(self.decode_times),
+            "frame_age_ms": summarize_ms(self.frame_ages),
+            "result_lag_ms": summarize_ms(self.result_lags),
+        }
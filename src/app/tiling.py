@@ -0,0 +1,122 @@
+import time
+
+import cv2
+import numpy as np
+
+from postprocessing import nms
+from preprocessing import decode_image
+from raw_frames import decode_raw_frame, is_raw_frame
+
+PAD_VALUE = 114  # Ultralytics' letterbox gray
+EDGE_MARGIN = 2
+
+
+class TiledImage:
+    """Model-sized views of one upload: overlapping tiles plus a whole-image pass.
+
+    `placements` holds, per view, the (offset_x, offset_y, scale_x, scale_y)
+    mapping model pixels back to original image coordinates, and whether
+    the view is a tile whose inner edges should drop truncated boxes.
+    """
+
+    def __init__(self, views, placements, orig_size, work_size, timings):
+        self.views = views
+        self.placements = placements
+        self.orig_size = orig_size
+        self.work_size = work_size
+        self.timings = timings
+
+
+def tile_offsets(length, tile_size, overlap):
+    """Start positions covering [0, length) with tiles overlapping by at least `overlap`."""
+    if length <= tile_size:
+        return [0]
+    stride = tile_size - overlap
+    offsets = list(range(0, length - tile_size, stride))
+    offsets.append(length - tile_size)  # Last tile flush with the edge instead of padding
+    return offsets
+
+
+def prepare_tiles(contents, input_size, max_dim, overlap):
+    """Decodes at up to `max_dim` on the longer side and splits into input_size tiles.
+
+    The whole image squashed to input_size is added as the first view, so
+    objects larger than a tile's overlap are still found once. Raw frames
+    that were already downscaled by the camera are tiled at their own size.
+    """
+    t_start = time.perf_counter()
+    if is_raw_frame(contents):
+        pixels, (orig_h, orig_w) = decode_raw_frame(contents)
+    else:
+        pixels, (orig_h, orig_w) = decode_image(contents, max_dim)
+    t_decoded = time.perf_counter()
+
+    scale = min(1.0, max_dim / max(orig_h, orig_w))
+    work_w = max(1, min(round(orig_w * scale), pixels.shape[1]))
+    work_h = max(1, min(round(orig_h * scale), pixels.shape[0]))
+    if pixels.shape[:2] != (work_h, work_w):
+        pixels = cv2.resize(pixels, (work_w, work_h), interpolation=cv2.INTER_AREA)
+    scale_x, scale_y = orig_w / work_w, orig_h / work_h
+
+    views = [cv2.resize(pixels, (input_size, input_size), interpolation=cv2.INTER_AREA)]
+    placements = [(0.0, 0.0, orig_w / input_size, orig_h / input_size, False)]
+
+    # An image that fits in one tile is fully seen by the whole-image pass
+    if max(work_h, work_w) > input_size:
+        # A side shorter than a tile is padded on the right/bottom, which maps back unchanged
+        if min(work_h, work_w) < input_size:
+            pixels = cv2.copyMakeBorder(
+                pixels, 0, max(0, input_size - work_h), 0, max(0, input_size - work_w),
+                cv2.BORDER_CONSTANT, value=(PAD_VALUE,) * 3
+            )
+        for y in tile_offsets(work_h, input_size, overlap):
+            for x in tile_offsets(work_w, input_size, overlap):
+                views.append(pixels[y:y + input_size, x:x + input_size])
+                placements.append((x * scale_x, y * scale_y, scale_x, scale_y, True))
+
+    timings = {
+        "decode": (t_decoded - t_start) * 1000,
+        "preprocess": (time.perf_counter() - t_decoded) * 1000,
+    }
+    return TiledImage(views, placements, (orig_h, orig_w), (work_h, work_w), timings)
+
+
+def merge_tiles(outputs, tiled, input_size, conf_threshold, nms_threshold):
+    """Maps every view's detections to image coordinates and runs one global NMS.
+
+    Tile boxes touching an edge shared with a neighbouring tile are dropped:
+    they are cut-off parts of an object that the neighbour (or the
+    whole-image pass) sees complete.
+    """
+    work_h, work_w = tiled.work_size
+    all_boxes, all_scores = [], []
+    for output, (offset_x, offset_y, scale_x, scale_y, is_tile) in zip(outputs, tiled.placements):
+        candidates = output[:, output[4] > np.float32(conf_threshold)].astype(np.float64)
+        if candidates.shape[1] == 0:
+            continue
+        cx, cy, w, h, scores = candidates[:5]
+
+        if is_tile:
+            tile_x, tile_y = offset_x / scale_x, offset_y / scale_y
+            truncated = (
+                ((cx - w / 2 <= EDGE_MARGIN) & (tile_x > 0))
+                | ((cy - h / 2 <= EDGE_MARGIN) & (tile_y > 0))
+                | ((cx + w / 2 >= input_size - EDGE_MARGIN) & (tile_x + input_size < work_w))
+                | ((cy + h / 2 >= input_size - EDGE_MARGIN) & (tile_y + input_size < work_h))
+            )
+            cx, cy, w, h, scores = cx[~truncated], cy[~truncated], w[~truncated], h[~truncated], scores[~truncated]
+
+        # Same rounding as postprocessing._process_single, so a lone view matches the single-shot path
+        w = np.trunc(w * scale_x)
+        h = np.trunc(h * scale_y)
+        x = np.trunc(cx * scale_x + offset_x - w / 2)
+        y = np.trunc(cy * scale_y + offset_y - h / 2)
+        all_boxes.append(np.stack([x, y, w, h], axis=1))
+        all_scores.append(scores)
+
+    if not all_boxes:
+        return np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32)
+    boxes = np.concatenate(all_boxes).astype(np.int32)
+    scores = np.concatenate(all_scores).astype(np.float32)
+    keep = nms(boxes, scores, nms_threshold)
+    return boxes[keep], scores[keep]
@@ -0,0 +1,177 @@
+import cv2
+import numpy as np
+
+from postprocessing import iou_matrix
+
+# Constant-velocity Kalman model over (cx, cy, w, h, vx, vy), as in SORT. The
+# measurement is the box itself, so H just selects the first four state entries.
+TRANSITION = np.eye(6)
+TRANSITION[0, 4] = TRANSITION[1, 5] = 1.0
+PROCESS_NOISE = np.diag([1.0, 1.0, 1.0, 1.0, 0.5, 0.5])
+INITIAL_COVARIANCE = np.diag([10.0, 10.0, 10.0, 10.0, 100.0, 100.0])
+DETECTION_NOISE = np.diag([1.0, 1.0, 2.0, 2.0])
+FLOW_NOISE = np.diag([4.0, 4.0, 16.0, 16.0])  # Flow only measures the shift, size is carried over
+
+# One pyramid level follows shifts of ~15 px between consecutive model-sized frames, at half
+# the cost of the usual two
+FLOW_PARAMS = dict(winSize=(15, 15), maxLevel=1, criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+GRID = np.stack(np.meshgrid(np.linspace(0.25, 0.75, 3), np.linspace(0.25, 0.75, 3)), axis=-1).reshape(-1, 2)
+MAX_FORWARD_BACKWARD_ERROR = 1.0
+
+
+def to_state_boxes(boxes):
+    """(x, y, w, h) -> (cx, cy, w, h)."""
+    return np.concatenate([boxes[:, :2] + boxes[:, 2:] / 2, boxes[:, 2:]], axis=1)
+
+
+class BoxTracker:
+    """Detect-then-track for one camera: the model runs every few frames, optical flow in between.
+
+    Detections are associated to tracks by greedy IoU. Between detections
+    each track's box is moved by the Lucas-Kanade flow of a grid of points
+    inside it (forward-backward checked), or by the whole frame's
+    flow when the box has too little texture. Confidence drops, and the
+    next frame is detected, once fewer than half of the tracks can be
+    followed. The count is the number of live tracks; a track survives
+    `max_misses` detection rounds without a match, which steadies the
+    count against detector flicker.
+
+    All tracks share one set of arrays and their Kalman filters are
+    stepped together, so a frame costs the same handful of numpy calls
+    for 3 or 50 packages. Tracking works on the model-sized frame; boxes
+    go in and out in image coordinates.
+    """
+
+    def __init__(self, detect_every=10, min_confidence=0.6, iou_threshold=0.3, max_misses=1):
+        self.detect_every = detect_every
+        self.min_confidence = min_confidence
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.states = np.empty((0, 6))
+        self.covariances = np.empty((0, 6, 6))
+        self.misses = np.empty(0, dtype=np.int64)  # Consecutive detection rounds without a match
+        self.scores = np.empty(0, dtype=np.float32)
+        self.confidence = 0.0
+        self.frames_since_detection = 0
+        self.detected_frames = 0
+        self.tracked_frames = 0
+        self._prev_gray = None
+        self._scale = np.ones(4)
+
+    def __len__(self):
+        return len(self.states)
+
+    def needs_detection(self, frame_size=None):
+        """True when the next frame should go through the model rather than the tracker.
+
+        A different `frame_size` (the input size changed under load) can't be
+        matched against the previous frame, so it always detects.
+        """
+        return (
+            self._prev_gray is None
+            or (frame_size is not None and tuple(frame_size) != self._prev_gray.shape)
+            or self.frames_since_detection + 1 >= self.detect_every
+            or (len(self) > 0 and self.confidence < self.min_confidence)
+        )
+
+    def _predict(self):
+        self.states = self.states @ TRANSITION.T
+        self.covariances = TRANSITION @ self.covariances @ TRANSITION.T + PROCESS_NOISE
+
+    def _correct(self, rows, measured, noise):
+        """Kalman update of the tracks in `rows` with measured (cx, cy, w, h) boxes."""
+        covariances = self.covariances[rows]
+        residual = measured - self.states[rows, :4]
+        gain = covariances[:, :, :4] @ np.linalg.inv(covariances[:, :4, :4] + noise)
+        self.states[rows] += (gain @ residual[:, :, None])[:, :, 0]
+        self.covariances[rows] = covariances - gain @ covariances[:, :4, :]
+
+    def _boxes(self):
+        """Current (x, y, w, h) boxes in tracking-frame pixels."""
+        return np.concatenate([self.states[:, :2] - self.states[:, 2:4] / 2, self.states[:, 2:4]], axis=1)
+
+    def update(self, pixels, boxes, scores, orig_size):
+        """Feeds a detection frame: model-sized RGB pixels and boxes in image coordinates."""
+        orig_h, orig_w = orig_size
+        self._scale = np.tile([pixels.shape[1] / orig_w, pixels.shape[0] / orig_h], 2)
+        detections = np.asarray(boxes, dtype=np.float64).reshape(-1, 4) * self._scale
+        scores = np.asarray(scores, dtype=np.float32)
+
+        self._predict()
+        matched = np.zeros(len(self), dtype=bool)
+        unmatched = np.ones(len(detections), dtype=bool)
+        if len(self) and len(detections):
+            overlaps = iou_matrix(self._boxes(), detections)
+            pairs = []
+            while overlaps.max() > self.iou_threshold:
+                t, d = np.unravel_index(overlaps.argmax(), overlaps.shape)
+                pairs.append((t, d))
+                overlaps[t, :] = overlaps[:, d] = 0.0
+            if pairs:
+                rows, cols = map(np.array, zip(*pairs))
+                self._correct(rows, to_state_boxes(detections[cols]), DETECTION_NOISE)
+                self.scores[rows] = scores[cols]
+                matched[rows] = True
+                unmatched[cols] = False
+
+        self.misses = np.where(matched, 0, self.misses + 1)
+        alive = self.misses <= self.max_misses
+        new = to_state_boxes(detections[unmatched])
+        self.states = np.concatenate([self.states[alive], np.hstack([new, np.zeros((len(new), 2))])])
+        self.covariances = np.concatenate([self.covariances[alive], np.repeat(INITIAL_COVARIANCE[None], len(new), 0)])
+        self.misses = np.concatenate([self.misses[alive], np.zeros(len(new), dtype=np.int64)])
+        self.scores = np.concatenate([self.scores[alive], scores[unmatched]])
+
+        self._prev_gray = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+        self.confidence = 1.0
+        self.frames_since_detection = 0
+        self.detected_frames += 1
+
+    def track(self, pixels):
+        """Moves the tracks to a new frame without running the model; returns the image-space boxes."""
+        gray = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+        if len(self):
+            boxes = self._boxes()
+            points = (boxes[:, None, :2] + GRID[None] * boxes[:, None, 2:]).reshape(-1, 1, 2).astype(np.float32)
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, points, None, **FLOW_PARAMS)
+            back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, moved, None, **FLOW_PARAMS)
+            error = np.linalg.norm((points - back).reshape(-1, 2), axis=1)
+            good = (status.ravel() == 1) & (back_status.ravel() == 1) & (error < MAX_FORWARD_BACKWARD_ERROR)
+            good = good.reshape(len(boxes), len(GRID))
+            shifts = (moved - points).reshape(len(boxes), len(GRID), 2)
+
+            # Half of a box's grid must agree for its own shift to count
+            followed = good.sum(axis=1) * 2 >= len(GRID)
+            measured = np.full((len(boxes), 2), np.nan)
+            # The forward-backward check already rejected the outliers, a mean is enough
+            own_shift = (shifts * good[:, :, None]).sum(axis=1) / np.maximum(good.sum(axis=1), 1)[:, None]
+            measured[followed] = own_shift[followed]
+            # Shelves don't move, the camera does: boxes on textureless packages take the shift
+            # of the whole frame, as long as most tracks could be followed on their own
+            if followed.mean() >= 0.5:
+                measured[~followed] = np.median(shifts[good], axis=0)
+                self.confidence = 1.0
+            else:
+                self.confidence = float(followed.mean())
+
+            self._predict()
+            rows = np.flatnonzero(~np.isnan(measured[:, 0]))
+            if len(rows):
+                shifted = boxes[rows] + np.hstack([measured[rows], np.zeros((len(rows), 2))])
+                self._correct(rows, to_state_boxes(shifted), FLOW_NOISE)
+
+        self._prev_gray = gray
+        self.frames_since_detection += 1
+        self.tracked_frames += 1
+        return self.boxes()
+
+    def boxes(self):
+        return np.trunc(self._boxes() / self._scale).astype(np.int32)
+
+    def stats(self):
+        return {
+            "tracks": len(self),
+            "confidence": round(self.confidence, 3),
+            "detected_frames": self.detected_frames,
+            "tracked_frames": self.tracked_frames,
+        }
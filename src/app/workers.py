@@ -0,0 +1,67 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class OverloadedError(Exception):
+    """Raised when a bounded queue is full and the caller should retry later."""
+
+
+def summarize_waits(wait_times):
+    """Average and p95 queue wait in ms over the recent samples."""
+    if not wait_times:
+        return {"wait_ms_avg": 0.0, "wait_ms_p95": 0.0}
+    waits = np.fromiter(wait_times, dtype=np.float64) * 1000
+    return {
+        "wait_ms_avg": round(float(waits.mean()), 2),
+        "wait_ms_p95": round(float(np.percentile(waits, 95)), 2),
+    }
+
+
+class BoundedExecutor:
+    """Size-limited thread pool for blocking work with a hard cap on queued jobs.
+
+    Keeps image decoding and JPEG encoding off the event loop. Once
+    `max_pending` jobs are queued or running, new submissions fail fast with
+    OverloadedError instead of piling up behind the workers.
+    """
+
+    def __init__(self, max_workers, max_pending, name="cpu-worker"):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.pending = 0
+        self.rejected = 0
+        self.wait_times = deque(maxlen=256)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise OverloadedError("Worker pool is saturated")
+
+        self.pending += 1
+        enqueued = time.perf_counter()
+
+        def job():
+            self.wait_times.append(time.perf_counter() - enqueued)
+            return fn(*args)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            self.pending -= 1
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.pending,
+            "queue_capacity": self.max_pending,
+            "rejected": self.rejected,
+            **summarize_waits(self.wait_times),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+
+# Shared with the server's tracker; postprocessing only depends on numpy. Imported flat
+# from src/app, which the importing scripts put on sys.path
+from postprocessing import iou_matrix
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png")
+
+
+def list_split(data_dir, split):
+    """(image_path, label_path) pairs of a YOLO-format split (`<split>/images`, `<split>/labels`)."""
+    images_dir = os.path.join(data_dir, split, "images")
+    labels_dir = os.path.join(data_dir, split, "labels")
+    return [
+        (os.path.join(images_dir, name), os.path.join(labels_dir, os.path.splitext(name)[0] + ".txt"))
+        for name in sorted(os.listdir(images_dir)) if name.lower().endswith(IMAGE_SUFFIXES)
+    ]
+
+
+def load_labels(label_path, orig_size):
+    """Ground truth as (x, y, w, h) pixel boxes, the same layout the server returns."""
+    orig_h, orig_w = orig_size
+    if not os.path.exists(label_path):
+        return np.empty((0, 4))
+    rows = np.loadtxt(label_path, ndmin=2)
+    if rows.size == 0:
+        return np.empty((0, 4))
+    cx, cy, w, h = rows[:, 1] * orig_w, rows[:, 2] * orig_h, rows[:, 3] * orig_w, rows[:, 4] * orig_h
+    return np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+
+
+def match_detections(boxes, scores, truth):
+    """(detections, 10) true-positive flags, one column per IoU threshold of 0.5:0.95.
+
+    Each ground-truth box is taken by at most one detection, highest score first.
+    """
+    correct = np.zeros((len(boxes), len(IOU_THRESHOLDS)), dtype=bool)
+    if len(boxes) == 0 or len(truth) == 0:
+        return correct
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    overlaps = iou_matrix(np.asarray(boxes, dtype=np.float64)[order], truth)
+    for t, threshold in enumerate(IOU_THRESHOLDS):
+        taken = np.zeros(len(truth), dtype=bool)
+        for row, i in enumerate(order):
+            candidates = np.where(taken, 0.0, overlaps[row])
+            best = candidates.argmax()
+            if candidates[best] >= threshold:
+                taken[best] = True
+                correct[i, t] = True
+    return correct
+
+
+def average_precision(correct, scores, n_truth):
+    """AP per IoU threshold with COCO's 101-point interpolated precision/recall curve."""
+    if n_truth == 0 or len(scores) == 0:
+        return np.zeros(correct.shape[1])
+    order = np.argsort(-scores, kind="stable")
+    tp = np.cumsum(correct[order], axis=0)
+    fp = np.cumsum(~correct[order], axis=0)
+    recall = tp / n_truth
+    precision = tp / (tp + fp)
+    points = np.linspace(0, 1, 101)
+    ap = np.zeros(correct.shape[1])
+    for t in range(correct.shape[1]):
+        # Precision envelope: the best precision at this recall or any higher one
+        envelope = np.maximum.accumulate(precision[::-1, t])[::-1]
+        index = np.searchsorted(recall[:, t], points, side="left")
+        ap[t] = np.where(index < len(envelope), envelope[np.minimum(index, len(envelope) - 1)], 0.0).mean()
+    return ap
+
+
+class DetectionStats:
+    """Accumulates per-image detections against ground truth into mAP and count error."""
+
+    def __init__(self):
+        self.correct = []
+        self.scores = []
+        self.n_truth = 0
+        self.count_errors = []
+
+    def add(self, boxes, scores, truth):
+        self.correct.append(match_detections(boxes, scores, truth))
+        self.scores.append(np.asarray(scores, dtype=np.float64))
+        self.n_truth += len(truth)
+        self.count_errors.append(len(boxes) - len(truth))
+
+    def summary(self):
+        if not self.count_errors:
+            return {"images": 0, "map50": 0.0, "map50_95": 0.0, "count_mae": 0.0, "count_exact": 0.0, "count_bias": 0.0}
+        ap = average_precision(np.concatenate(self.correct), np.concatenate(self.scores), self.n_truth)
+        errors = np.array(self.count_errors)
+        return {
+            "images": len(errors),
+            "map50": round(float(ap[0]), 4),
+            "map50_95": round(float(ap.mean()), 4),
+            "count_mae": round(float(np.abs(errors).mean()), 3),
+            "count_exact": round(float((errors == 0).mean()), 4),  # Share of images counted exactly
+            "count_bias": round(float(errors.mean()), 3),  # > 0: over-counting
+        }
@@ -0,0 +1,203 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+# The serving code is imported flat from src/app: images are prepared and detections
+# post-processed by exactly the functions the server runs
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "app"))
+
+from detection_metrics import DetectionStats, list_split, load_labels  # noqa: E402
+from engines import OnnxEngine, cpu_quota  # noqa: E402
+from postprocessing import get_processed_detections  # noqa: E402
+from preprocessing import fill_input_tensor, prepare_image  # noqa: E402
+
+# CONFIGURATION
+
+IMGSZ = 320
+DATA_DIR = os.path.join(BASE_DIR, "data")
+# Kept out of data/, which DVC tracks as a whole
+CACHE_DIR = os.path.join(BASE_DIR, ".eval_cache")
+DEFAULT_MODEL = os.path.join(BASE_DIR, "app", "models", "production", "inventory_monitor_quantized.onnx")
+# Only names the engine: any ONNX file is evaluated the same way, whatever its precision
+ENGINE_LABEL = "eval"
+
+# Set in each worker process by the pool initializers
+_worker = {}
+
+
+def split_fingerprint(samples, input_size):
+    """Changes whenever an image or label is added, removed or rewritten, or the input size changes."""
+    digest = hashlib.sha1(str(input_size).encode())
+    for image_path, label_path in samples:
+        for path in (image_path, label_path):
+            stat = os.stat(path) if os.path.exists(path) else None
+            digest.update(f"{os.path.basename(path)}:{stat and stat.st_size}:{stat and stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def _init_cache_worker(pixels_path, input_size):
+    _worker["pixels"] = np.load(pixels_path, mmap_mode="r+")
+    _worker["input_size"] = input_size
+
+
+def _cache_image(task):
+    """Decodes one image straight into its row of the shared memmap; returns its original size."""
+    index, image_path = task
+    with open(image_path, "rb") as f:
+        prepared = prepare_image(f.read(), _worker["input_size"])
+    _worker["pixels"][index] = prepared.pixels
+    return index, prepared.orig_size
+
+
+def build_cache(samples, cache_dir, input_size, workers):
+    """Preprocesses the split once: model-sized uint8 pixels in a memmapped .npy, labels and sizes beside it."""
+    os.makedirs(cache_dir, exist_ok=True)
+    pixels_path = os.path.join(cache_dir, "pixels.npy")
+    pixels = np.lib.format.open_memmap(pixels_path, mode="w+", dtype=np.uint8,
+                                       shape=(len(samples), input_size, input_size, 3))
+    del pixels  # Header and file size are written; workers fill rows through their own maps
+
+    orig_sizes = np.zeros((len(samples), 2), dtype=np.int64)
+    tasks = [(i, image_path) for i, (image_path, _) in enumerate(samples)]
+    with multiprocessing.Pool(workers, _init_cache_worker, (pixels_path, input_size)) as pool:
+        for index, orig_size in pool.imap_unordered(_cache_image, tasks, chunksize=16):
+            orig_sizes[index] = orig_size
+
+    # Ground truth in pixel (x, y, w, h), flattened with per-image offsets
+    truth = [load_labels(label_path, orig_sizes[i]) for i, (_, label_path) in enumerate(samples)]
+    offsets = np.cumsum([0] + [len(boxes) for boxes in truth])
+    np.savez(os.path.join(cache_dir, "labels.npz"), orig_sizes=orig_sizes, offsets=offsets,
+             boxes=np.concatenate(truth) if truth else np.empty((0, 4)))
+
+
+def load_cache(data_dir, split, input_size, workers, cache_root=CACHE_DIR, rebuild=False):
+    """The split's cache, rebuilt when missing or stale. Returns (pixels memmap path, labels)."""
+    samples = list_split(data_dir, split)
+    cache_dir = os.path.join(cache_root, f"{os.path.basename(os.path.abspath(data_dir))}_{split}_{input_size}")
+    meta_path = os.path.join(cache_dir, "meta.json")
+    fingerprint = split_fingerprint(samples, input_size)
+
+    meta = None
+    if os.path.exists(meta_path) and not rebuild:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    if meta is None or meta["fingerprint"] != fingerprint:
+        print(f"[CACHE] Preprocessing {len(samples)} '{split}' images at {input_size}px...")
+        t_start = time.perf_counter()
+        build_cache(samples, cache_dir, input_size, workers)
+        meta = {"fingerprint": fingerprint, "split": split, "input_size": input_size, "images": len(samples),
+                "build_seconds": round(time.perf_counter() - t_start, 2)}
+        with open(meta_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        print(f"[CACHE] Built in {meta['build_seconds']:.1f}s: {cache_dir}")
+    else:
+        print(f"[CACHE] Using {meta['images']} cached '{split}' images: {cache_dir}")
+
+    labels = dict(np.load(os.path.join(cache_dir, "labels.npz")))
+    return os.path.join(cache_dir, "pixels.npy"), labels
+
+
+def _init_eval_worker(model_path, pixels_path, orig_sizes, batch_size):
+    engine = OnnxEngine(model_path, ENGINE_LABEL, intra_op_threads=1, max_batch_size=batch_size)
+    engine.load()
+    _worker["engine"] = engine
+    _worker["pixels"] = np.load(pixels_path, mmap_mode="r")
+    _worker["orig_sizes"] = orig_sizes
+    input_size = _worker["pixels"].shape[1]
+    _worker["batch"] = np.empty((batch_size, 3, input_size, input_size), dtype=np.float32)
+
+
+def _evaluate_batch(span):
+    """Runs one slice of the cache through the model and the server's post-processing."""
+    start, stop = span
+    pixels, batch = _worker["pixels"], _worker["batch"][:stop - start]
+    for i in range(start, stop):
+        fill_input_tensor(pixels[i], batch[i - start])
+    t_start = time.perf_counter()
+    output = _worker["engine"].infer_batch(batch)
+    inference_s = time.perf_counter() - t_start
+    orig_sizes = [tuple(size) for size in _worker["orig_sizes"][start:stop]]
+    # The server's confidence and NMS thresholds are the defaults
+    detections = get_processed_detections(output, orig_sizes, pixels.shape[1])
+    return start, detections, inference_s
+
+
+def evaluate_model(model_path, pixels_path, labels, workers, batch_size):
+    """Count accuracy and mAP of one ONNX model over the cached split."""
+    probe = OnnxEngine(model_path, ENGINE_LABEL, intra_op_threads=1)
+    probe.load()
+    if probe.max_batch_size is not None:  # Exported with a fixed batch axis
+        batch_size = min(batch_size, probe.max_batch_size)
+    del probe
+
+    orig_sizes, offsets, truth = labels["orig_sizes"], labels["offsets"], labels["boxes"]
+    spans = [(start, min(start + batch_size, len(orig_sizes))) for start in range(0, len(orig_sizes), batch_size)]
+    results = [None] * len(orig_sizes)
+    inference_s = 0.0
+    t_start = time.perf_counter()
+    with multiprocessing.Pool(workers, _init_eval_worker, (model_path, pixels_path, orig_sizes, batch_size)) as pool:
+        for start, detections, batch_inference_s in pool.imap_unordered(_evaluate_batch, spans):
+            results[start:start + len(detections)] = detections
+            inference_s += batch_inference_s
+    elapsed = time.perf_counter() - t_start
+
+    stats = DetectionStats()
+    for i, (boxes, scores) in enumerate(results):
+        stats.add(boxes, scores, truth[offsets[i]:offsets[i + 1]])
+    return {
+        "model": model_path,
+        **stats.summary(),
+        "images_per_second": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "inference_ms_per_image": round(inference_s / max(1, len(results)) * 1000, 2),
+        "seconds": round(elapsed, 2),
+    }
+
+
+def print_results(results):
+    print("\n" + "=" * 100)
+    print(f"{'Model':<36} | {'mAP50':>7} | {'mAP50-95':>8} | {'Count MAE':>9} | {'Exact':>6} | "
+          f"{'Bias':>6} | {'Images/s':>8} | {'Time':>6}")
+    for result in results:
+        print(f"{os.path.basename(result['model'])[:36]:<36} | {result['map50']:>7.4f} | {result['map50_95']:>8.4f} | "
+              f"{result['count_mae']:>9.3f} | {result['count_exact'] * 100:>5.1f}% | {result['count_bias']:>+6.2f} | "
+              f"{result['images_per_second']:>8.1f} | {result['seconds']:>5.1f}s")
+    print("=" * 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline evaluation of ONNX models through the server's code path")
+    parser.add_argument("models", nargs="*", default=[DEFAULT_MODEL], help="ONNX models to compare")
+    parser.add_argument("--data", default=DATA_DIR, help="YOLO-format dataset root")
+    parser.add_argument("--split", default="test")
+    parser.add_argument("--imgsz", type=int, default=IMGSZ)
+    # The container's CPU quota, not the host's core count
+    parser.add_argument("--workers", type=int, default=cpu_quota())
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--rebuild-cache", action="store_true")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    pixels_path, labels = load_cache(args.data, args.split, args.imgsz, args.workers, args.cache_dir,
+                                     args.rebuild_cache)
+    results = []
+    for model_path in args.models:
+        print(f"[EVAL] {model_path} ({args.workers} workers, batch {args.batch_size})")
+        results.append(evaluate_model(model_path, pixels_path, labels, args.workers, args.batch_size))
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] Results saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
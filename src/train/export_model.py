@@ -0,0 +1,239 @@
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+# The serving code is imported flat from src/app, so calibration and evaluation
+# preprocess and post-process exactly like the server does
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "app"))
+
+from detection_metrics import DetectionStats, list_split, load_labels  # noqa: E402
+from engines import OnnxEngine  # noqa: E402
+# The server's thresholds: metrics are measured at the operating point
+from postprocessing import CONFIDENCE_THRESHOLD, NMS_THRESHOLD, get_processed_detections  # noqa: E402
+from preprocessing import fill_input_tensor, prepare_image  # noqa: E402
+
+# CONFIGURATION
+
+IMGSZ = 320
+PROJECT_FOLDER_NAME = "models"
+RUN_NAME = "inventory_monitor"
+PRODUCTION_DIR = os.path.join(BASE_DIR, "app", "models", "production")
+
+CALIBRATION_SPLIT = "train"
+CALIBRATION_IMAGES = 300
+EVALUATION_SPLIT = "test"
+LATENCY_WARMUP_RUNS = 5
+
+# Publishing gates: the INT8 model may lose at most this much against the fp32 export,
+# and against the model currently in production (when there is one)
+MAX_MAP50_DROP = 0.02
+MAX_MAP50_95_DROP = 0.02
+MAX_COUNT_MAE_INCREASE = 0.25
+MAX_LATENCY_RATIO = 1.0  # INT8 p50 latency relative to fp32; a slower INT8 model is pointless
+
+
+class CalibrationReader:
+    """Feeds training images to ONNX Runtime's calibrator, preprocessed like a server upload."""
+
+    def __init__(self, image_paths, input_name):
+        self.image_paths = list(image_paths)
+        self.input_name = input_name
+        self.position = 0
+
+    def get_next(self):
+        if self.position >= len(self.image_paths):
+            return None
+        with open(self.image_paths[self.position], "rb") as f:
+            prepared = prepare_image(f.read(), IMGSZ)
+        self.position += 1
+        batch = np.empty((1, 3, IMGSZ, IMGSZ), dtype=np.float32)
+        fill_input_tensor(prepared.pixels, batch[0])
+        return {self.input_name: batch}
+
+    def rewind(self):
+        self.position = 0
+
+
+def head_decode_nodes(model):
+    """Non-conv nodes of the detection head (DFL, sigmoid, box decoding), kept in float.
+
+    Quantizing the decode step puts pixel coordinates and confidences on an
+    8-bit grid, which costs far more mAP than it saves time.
+    """
+    heads = [int(node.name.split("/")[1].split(".")[1]) for node in model.graph.node
+             if node.name.startswith("/model.") and node.name.split("/")[1].split(".")[1].isdigit()]
+    if not heads:
+        return []
+    prefix = f"/model.{max(heads)}/"
+    return [node.name for node in model.graph.node if node.name.startswith(prefix) and node.op_type != "Conv"]
+
+
+def export_fp32(weights_path):
+    """ONNX export with dynamic batch/height/width and the graph simplified (constant folding, fused ops)."""
+    from ultralytics import YOLO
+
+    print("[EXPORT] Exporting fp32 ONNX (dynamic axes, simplified)...")
+    return YOLO(weights_path).export(format="onnx", imgsz=IMGSZ, dynamic=True, simplify=True)
+
+
+def quantize_int8(fp32_path, int8_path, calibration_paths):
+    """Static INT8 quantization (QDQ, per-channel weights) calibrated on training images."""
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    print(f"[QUANTIZE] Calibrating on {len(calibration_paths)} '{CALIBRATION_SPLIT}' images...")
+    prepared_path = int8_path.replace(".onnx", "_prep.onnx")
+    quant_pre_process(fp32_path, prepared_path)
+    model = onnx.load(prepared_path)
+    quantize_static(
+        prepared_path,
+        int8_path,
+        CalibrationReader(calibration_paths, model.graph.input[0].name),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=head_decode_nodes(model),
+    )
+    os.remove(prepared_path)
+    return int8_path
+
+
+def summarize_latency(samples_ms):
+    values = np.array(samples_ms)
+    return {"p50": round(float(np.percentile(values, 50)), 2), "p95": round(float(np.percentile(values, 95)), 2)}
+
+
+def evaluate_onnx(model_path, precision, samples):
+    """mAP, count error and batch-1 CPU latency through the server's preprocessing and post-processing."""
+    engine = OnnxEngine(model_path, precision, max_batch_size=1)
+    engine.load()
+    engine.warmup(IMGSZ, (1,), LATENCY_WARMUP_RUNS)
+    stats, latencies = DetectionStats(), []
+    batch = np.empty((1, 3, IMGSZ, IMGSZ), dtype=np.float32)
+    for image_path, label_path in samples:
+        with open(image_path, "rb") as f:
+            prepared = prepare_image(f.read(), IMGSZ)
+        fill_input_tensor(prepared.pixels, batch[0])
+        t_start = time.perf_counter()
+        output = engine.infer_batch(batch)[0]
+        latencies.append((time.perf_counter() - t_start) * 1000)
+        boxes, scores = get_processed_detections(output, prepared.orig_size, IMGSZ)
+        stats.add(boxes, scores, load_labels(label_path, prepared.orig_size))
+    return {**stats.summary(), "latency_ms": summarize_latency(latencies),
+            "size_mb": round(os.path.getsize(model_path) / 1e6, 2)}
+
+
+def evaluate_pt(weights_path, samples):
+    """Same metrics for the PyTorch weights, through Ultralytics' own (letterboxed) predict."""
+    from ultralytics import YOLO
+
+    model = YOLO(weights_path)
+    stats, latencies = DetectionStats(), []
+    for i, (image_path, label_path) in enumerate(samples):
+        result = model.predict(image_path, imgsz=IMGSZ, conf=CONFIDENCE_THRESHOLD, iou=NMS_THRESHOLD,
+                               device="cpu", verbose=False)[0]
+        if i >= LATENCY_WARMUP_RUNS:
+            latencies.append(result.speed["inference"])
+        xywh = result.boxes.xywh.numpy()
+        boxes = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, 2:]], axis=1)
+        stats.add(boxes, result.boxes.conf.numpy(), load_labels(label_path, result.orig_shape))
+    return {**stats.summary(), "latency_ms": summarize_latency(latencies or [0.0]),
+            "size_mb": round(os.path.getsize(weights_path) / 1e6, 2)}
+
+
+def check_gates(report):
+    """Reasons the INT8 model must not be published; empty when it passes."""
+    failures = []
+    int8 = report["models"]["int8"]
+    baselines = {"fp32": report["models"]["fp32"]}
+    if "production" in report["models"]:
+        baselines["production"] = report["models"]["production"]
+    for name, baseline in baselines.items():
+        if baseline["map50"] - int8["map50"] > MAX_MAP50_DROP:
+            failures.append(f"mAP50 {int8['map50']:.4f} is more than {MAX_MAP50_DROP} below {name} "
+                            f"({baseline['map50']:.4f})")
+        if baseline["map50_95"] - int8["map50_95"] > MAX_MAP50_95_DROP:
+            failures.append(f"mAP50-95 {int8['map50_95']:.4f} is more than {MAX_MAP50_95_DROP} below {name} "
+                            f"({baseline['map50_95']:.4f})")
+        if int8["count_mae"] - baseline["count_mae"] > MAX_COUNT_MAE_INCREASE:
+            failures.append(f"count MAE {int8['count_mae']:.3f} is more than {MAX_COUNT_MAE_INCREASE} above {name} "
+                            f"({baseline['count_mae']:.3f})")
+    fp32_p50 = report["models"]["fp32"]["latency_ms"]["p50"]
+    if int8["latency_ms"]["p50"] > fp32_p50 * MAX_LATENCY_RATIO:
+        failures.append(f"INT8 p50 latency {int8['latency_ms']['p50']:.2f} ms is not below fp32 ({fp32_p50:.2f} ms)")
+    return failures
+
+
+def print_report(report):
+    print("\n" + "=" * 92)
+    print(f"EXPORT REPORT ({report['evaluation_images']} '{EVALUATION_SPLIT}' images, "
+          f"conf {CONFIDENCE_THRESHOLD}, NMS {NMS_THRESHOLD})")
+    print(f"{'Model':<11} | {'mAP50':>7} | {'mAP50-95':>8} | {'Count MAE':>9} | {'Exact':>6} | "
+          f"{'p50 ms':>7} | {'p95 ms':>7} | {'Size MB':>7}")
+    for name, metrics in report["models"].items():
+        print(f"{name:<11} | {metrics['map50']:>7.4f} | {metrics['map50_95']:>8.4f} | {metrics['count_mae']:>9.3f} | "
+              f"{metrics['count_exact'] * 100:>5.1f}% | {metrics['latency_ms']['p50']:>7.2f} | "
+              f"{metrics['latency_ms']['p95']:>7.2f} | {metrics['size_mb']:>7.2f}")
+    print("=" * 92)
+
+
+def calibration_sample(data_dir):
+    """A fixed random sample of the calibration split, so reruns quantize identically."""
+    samples = list_split(data_dir, CALIBRATION_SPLIT)
+    rng = np.random.default_rng(0)
+    keep = rng.choice(len(samples), min(CALIBRATION_IMAGES, len(samples)), replace=False)
+    return [samples[i] for i in sorted(keep)]
+
+
+def run_export(weights_path, data_dir, output_dir, publish=True):
+    """Exports, quantizes and evaluates `weights_path`; publishes only if the INT8 model passes the gates."""
+    fp32_path = export_fp32(weights_path)
+    int8_path = quantize_int8(fp32_path, os.path.join(output_dir, "inventory_monitor_quantized.onnx"),
+                              [path for path, _ in calibration_sample(data_dir)])
+
+    samples = list_split(data_dir, EVALUATION_SPLIT)
+    print(f"[EVAL] Evaluating on {len(samples)} '{EVALUATION_SPLIT}' images...")
+    models = {"pt": evaluate_pt(weights_path, samples), "fp32": evaluate_onnx(fp32_path, "fp32", samples),
+              "int8": evaluate_onnx(int8_path, "int8", samples)}
+    production_path = os.path.join(PRODUCTION_DIR, "inventory_monitor_quantized.onnx")
+    if os.path.exists(production_path):
+        models["production"] = evaluate_onnx(production_path, "int8", samples)
+
+    report = {"weights": weights_path, "evaluation_images": len(samples), "models": models}
+    report["failures"] = check_gates(report)
+    report["published"] = publish and not report["failures"]
+    print_report(report)
+
+    report_path = os.path.join(output_dir, "export_report.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Report saved to: {report_path}")
+
+    if report["failures"]:
+        for failure in report["failures"]:
+            print(f"[REJECTED] {failure}")
+        return report
+    if publish:
+        os.makedirs(PRODUCTION_DIR, exist_ok=True)
+        shutil.copy(int8_path, production_path)
+        shutil.copy(fp32_path, os.path.join(PRODUCTION_DIR, "inventory_monitor.onnx"))
+        shutil.copy(weights_path, os.path.join(PRODUCTION_DIR, "inventory_monitor.pt"))
+        print(f"[SUCCESS] Published to: {PRODUCTION_DIR}")
+    return report
+
+
+if __name__ == "__main__":
+    models_path = os.path.join(BASE_DIR, PROJECT_FOLDER_NAME)
+    best_model_path = os.path.join(models_path, RUN_NAME, "weights", "best.pt")
+    if not os.path.exists(best_model_path):
+        sys.exit(f"[ERROR] The model 'best.pt' is not found in: {best_model_path}")
+    result = run_export(best_model_path, os.path.join(BASE_DIR, "data"), os.path.join(models_path, RUN_NAME))
+    sys.exit(1 if result["failures"] else 0)
@@ -2,6 +2,8 @@ import os
 import torch
 from ultralytics import YOLO
 
+from export_model import run_export
+
 # CONFIGURATION
 
 IMGSZ = 320
@@ -60,10 +62,11 @@ def run_final_test():
     print(f"Recall:    {results.box.mr:.4f}")
     print("=" * 30)
 
-    # 7. EXPORT TO ONNX
+    # 7. EXPORT, QUANTIZE AND PUBLISH (only if INT8 passes the regression gates, see export_model)
     print("\n[EXPORT] Exporting best model to ONNX for production...")
-    model.export(format="onnx")
-    print(f"[SUCCESS] Test completed. Results saved in: {MODELS_ABSOLUTE_PATH}/{RUN_NAME}")
+    report = run_export(best_model_path, os.path.join(BASE_DIR, "data"), os.path.join(MODELS_ABSOLUTE_PATH, RUN_NAME))
+    status = "published" if report["published"] else "NOT published"
+    print(f"[SUCCESS] Test completed, model {status}. Results saved in: {MODELS_ABSOLUTE_PATH}/{RUN_NAME}")
 
 
 if __name__ == "__main__":
@@ -6,6 +6,9 @@ resource "aws_ecs_service" "onnx" {
   task_definition = aws_ecs_task_definition.onnx.arn
   launch_type     = "FARGATE"
 
+  # The task mounts the history volume, which needs its mount target first
+  depends_on = [aws_efs_mount_target.history]
+
   # 1 instance if mode is 'onnx', otherwise 0 to save costs
   desired_count = var.benchmark_mode == "onnx" ? 1 : 0
 
@@ -24,6 +27,9 @@ resource "aws_ecs_service" "pytorch" {
   task_definition = aws_ecs_task_definition.pytorch.arn
   launch_type     = "FARGATE"
 
+  # The task mounts the history volume, which needs its mount target first
+  depends_on = [aws_efs_mount_target.history]
+
   # 1 instance if mode is 'pytorch', otherwise 0
   desired_count = var.benchmark_mode == "pytorch" ? 1 : 0
 
@@ -0,0 +1,50 @@
+# terraform/storage.tf
+
+# Persistent volume for the detection history (SQLite), so it survives task replacement.
+# Fargate task storage is ephemeral; EFS is the only volume type that outlives the task.
+resource "aws_efs_file_system" "history" {
+  creation_token = "inventory-monitor-history"
+  encrypted      = true
+
+  tags = {
+    Name = "inventory-monitor-history"
+  }
+}
+
+resource "aws_security_group" "history_efs_sg" {
+  name        = "inventory-monitor-history-efs-sg"
+  description = "Allow NFS from the inference tasks to the history volume"
+  vpc_id      = aws_vpc.main.id
+
+  ingress {
+    from_port       = 2049
+    to_port         = 2049
+    protocol        = "tcp"
+    security_groups = [aws_security_group.api_sg.id]
+  }
+}
+
+resource "aws_efs_mount_target" "history" {
+  file_system_id  = aws_efs_file_system.history.id
+  subnet_id       = aws_subnet.public.id
+  security_groups = [aws_security_group.history_efs_sg.id]
+}
+
+# The containers run as root; the access point pins them to their own directory
+resource "aws_efs_access_point" "history" {
+  file_system_id = aws_efs_file_system.history.id
+
+  posix_user {
+    uid = 0
+    gid = 0
+  }
+
+  root_directory {
+    path = "/history"
+    creation_info {
+      owner_uid   = 0
+      owner_gid   = 0
+      permissions = "755"
+    }
+  }
+}
@@ -16,6 +16,18 @@ resource "aws_ecs_task_definition" "onnx" {
 
   execution_role_arn = aws_iam_role.ecs_task_execution_role.arn
 
+  # Detection history on EFS (see storage.tf)
+  volume {
+    name = "history"
+    efs_volume_configuration {
+      file_system_id     = aws_efs_file_system.history.id
+      transit_encryption = "ENABLED"
+      authorization_config {
+        access_point_id = aws_efs_access_point.history.id
+      }
+    }
+  }
+
   container_definitions = jsonencode([
     {
       name      = "inference-api"
@@ -29,8 +41,22 @@ resource "aws_ecs_task_definition" "onnx" {
       ]
       environment = [
             { name = "DUCKDNS_TOKEN",  value = var.duckdns_token },
-            { name = "DUCKDNS_DOMAIN", value = var.duckdns_domain }
+            { name = "DUCKDNS_DOMAIN", value = var.duckdns_domain },
+            { name = "HISTORY_DB_PATH", value = "/mnt/history/history.db" },
+            # WAL needs shared memory, which NFS doesn't provide; rollback journal + NFS locks do
+            { name = "HISTORY_JOURNAL_MODE", value = "DELETE" }
       ]
+      mountPoints = [
+        { sourceVolume = "history", containerPath = "/mnt/history" }
+      ]
+      # Healthy only once the model is loaded and warm (/health/ready)
+      healthCheck = {
+        command     = ["CMD-SHELL", "python -c \"import urllib.request; urllib.request.urlopen('http://localhost:8000/health/ready', timeout=2)\""]
+        interval    = 10
+        timeout     = 5
+        retries     = 3
+        startPeriod = 30
+      }
       logConfiguration = {
         logDriver = "awslogs"
         options = {
@@ -54,6 +80,18 @@ resource "aws_ecs_task_definition" "pytorch" {
 
   execution_role_arn = aws_iam_role.ecs_task_execution_role.arn
 
+  # Detection history on EFS (see storage.tf)
+  volume {
+    name = "history"
+    efs_volume_configuration {
+      file_system_id     = aws_efs_file_system.history.id
+      transit_encryption = "ENABLED"
+      authorization_config {
+        access_point_id = aws_efs_access_point.history.id
+      }
+    }
+  }
+
   container_definitions = jsonencode([
     {
       name      = "inference-api"
@@ -65,6 +103,22 @@ resource "aws_ecs_task_definition" "pytorch" {
           hostPort      = 8000
         }
       ]
+      environment = [
+            { name = "HISTORY_DB_PATH", value = "/mnt/history/history.db" },
+            # WAL needs shared memory, which NFS doesn't provide; rollback journal + NFS locks do
+            { name = "HISTORY_JOURNAL_MODE", value = "DELETE" }
+      ]
+      mountPoints = [
+        { sourceVolume = "history", containerPath = "/mnt/history" }
+      ]
+      # Same readiness gate as the ONNX task; importing torch and loading the checkpoint takes longer
+      healthCheck = {
+        command     = ["CMD-SHELL", "python -c \"import urllib.request; urllib.request.urlopen('http://localhost:8000/health/ready', timeout=2)\""]
+        interval    = 10
+        timeout     = 5
+        retries     = 3
+        startPeriod = 60
+      }
       logConfiguration = {
         logDriver = "awslogs"
         options = {